@@ -9,7 +9,7 @@ import shutil
 from pathlib import Path
 from typing import Dict, List, Optional, TYPE_CHECKING
 from utils.logger import LoggerMixin, log_success, log_error, log_warning
-from utils.resource_manager import temp_file
+from utils.resource_manager import temp_file, get_resource_manager
 
 if TYPE_CHECKING:
     from core.google_drive_service import GoogleDriveService
@@ -83,8 +83,11 @@ class VaultInitializer(LoggerMixin):
                 log_success(f"✅ Vault at {self.vault_path} is already complete")
                 return True
             
-            # Create vault structure
-            success = self._create_vault_structure(vault_status)
+            # Create vault structure; upload temp files are removed in one batch
+            try:
+                success = self._create_vault_structure(vault_status)
+            finally:
+                get_resource_manager().flush_deletes()
             
             if success:
                 log_success(f"🎉 Vault successfully initialized at {self.vault_path}")
@@ -258,7 +261,7 @@ class VaultInitializer(LoggerMixin):
         """Upload a file to Google Drive vault with proper resource management"""
         try:
             # Use resource-managed temporary file
-            with temp_file(suffix='.md', prefix='vault_upload_') as temp_file_path:
+            with temp_file(suffix='.md', prefix='vault_upload_', defer=True) as temp_file_path:
                 # Write content to temporary file
                 temp_file_path.write_text(content, encoding='utf-8')
                 
@@ -371,7 +374,7 @@ class VaultInitializer(LoggerMixin):
             config_content = self.obsidian_config[config_file]
             
             # Use resource-managed temporary file
-            with temp_file(suffix='.json', prefix='obsidian_config_') as temp_file_path:
+            with temp_file(suffix='.json', prefix='obsidian_config_', defer=True) as temp_file_path:
                 # Write JSON content to temporary file
                 with open(temp_file_path, 'w', encoding='utf-8') as f:
                     json.dump(config_content, f, indent=2)
@@ -630,7 +630,10 @@ Restart the processor after updating.
         for _ in range(self.processing_queue.maxsize or 2):
             self.processing_queue.put(None)
         self.processing_queue.join()
-        
+
+        # Persist any pending cache writes
+        self.intelligent_cache.flush()
+
         # Clean up resources
         self.logger.info("🧹 Cleaning up resources...")
         cleanup_resources()
@@ -3,29 +3,40 @@ Custom Exception Hierarchy for Meeting Processor
 Provides domain-specific exceptions with actionable guidance
 """
 
-from typing import Optional, Dict, Any, List
+import io
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+# Characters replaced with underscores when embedding a filename in a report name
+_SAFE_FN_TABLE = str.maketrans({'.': '_', ' ': '_'})
+_TS_FMT = "%Y%m%d_%H%M%S"
+
+# Bound once at import so report builders skip the datetime attribute lookup
+_now = datetime.now
 
 
 class MeetingProcessorError(Exception):
     """Base exception for Meeting Processor with enhanced error reporting"""
     
+    # Fields exposed in structured error reports, in report order
+    _ERROR_FIELDS = ('message', 'details', 'solutions', 'help_url')
+    
     def __init__(self, message: str, details: Optional[str] = None, 
                  solutions: Optional[List[str]] = None, help_url: Optional[str] = None):
         super().__init__(message)
         self.message = message
         self.details = details
-        self.solutions = solutions or []
+        self.solutions = tuple(solutions) if solutions else ()
         self.help_url = help_url
     
     def get_error_report(self) -> Dict[str, Any]:
         """Generate structured error report"""
-        return {
-            'error_type': self.__class__.__name__,
-            'message': self.message,
-            'details': self.details,
-            'solutions': self.solutions,
-            'help_url': self.help_url
-        }
+        report = {'error_type': type(self).__name__}
+        report.update(zip(self._ERROR_FIELDS,
+                          (self.message, self.details, self.solutions, self.help_url)))
+        return report
     
     def get_user_friendly_message(self) -> str:
         """Get formatted message for user display"""
@@ -41,13 +52,222 @@ class MeetingProcessorError(Exception):
         return msg
 
 
+# Troubleshooting documentation links
+_HELP_CONFIGURATION = "https://docs.anthropic.com/claude-code/configuration"
+_HELP_GOOGLE_DRIVE = "https://docs.anthropic.com/claude-code/google-drive"
+_HELP_AUDIO = "https://docs.anthropic.com/claude-code/troubleshooting#audio-issues"
+_HELP_TRANSCRIPTION = "https://docs.anthropic.com/claude-code/troubleshooting#transcription-issues"
+_HELP_ANALYSIS = "https://docs.anthropic.com/claude-code/troubleshooting#analysis-issues"
+_HELP_RESOURCE = "https://docs.anthropic.com/claude-code/troubleshooting#resource-issues"
+_HELP_NETWORK = "https://docs.anthropic.com/claude-code/troubleshooting#network-issues"
+
+# A rule is (pattern, solutions, help_url). Rules are checked in order and the
+# first one whose pattern occurs anywhere in the probe text wins.
+_Rule = Tuple[str, Tuple[str, ...], Optional[str]]
+
+
+class _RuleSet:
+    """Ordered keyword rules compiled into a single regex search"""
+    
+    def __init__(self, rules: Tuple[_Rule, ...], flags: int = 0):
+        # Each alternative is anchored at the start and looks ahead for its
+        # pattern, so the regex engine tries rules in declaration order and
+        # the first rule that matches anywhere in the text is selected
+        alternatives = '|'.join(
+            f'(?=.*?(?P<r{i}>{pattern}))' for i, (pattern, _, _) in enumerate(rules)
+        )
+        self._regex = re.compile(rf'\A(?:{alternatives})', flags | re.DOTALL)
+        self._outcomes = tuple((solutions, help_url) for _, solutions, help_url in rules)
+    
+    def classify(self, text: str) -> Optional[Tuple[Tuple[str, ...], Optional[str]]]:
+        """Return (solutions, help_url) of the first matching rule, or None"""
+        match = self._regex.search(text)
+        if match is None:
+            return None
+        return self._outcomes[int(match.lastgroup[1:])]
+
+
+_CONFIG_RULES = _RuleSet((
+    ('api_key', (
+        "Set {field} in your .env file",
+        "Ensure the API key is valid and has proper permissions",
+        "Check that the .env file is in the correct directory"
+    ), _HELP_CONFIGURATION),
+    ('path', (
+        "Verify that the path in {field} exists and is accessible",
+        "Use absolute paths to avoid confusion",
+        "Check file/directory permissions"
+    ), None),
+    ('folder_id', (
+        "Verify the Google Drive folder ID is correct",
+        "Ensure the service account has access to the folder",
+        "Check that the folder exists and is not in Trash"
+    ), _HELP_GOOGLE_DRIVE),
+), re.IGNORECASE)
+
+_AUDIO_RULES = _RuleSet((
+    ('No such file or directory', (
+        "Verify the input file exists and is accessible",
+        "Check file permissions",
+        "Ensure the file path doesn't contain special characters"
+    ), _HELP_AUDIO),
+    ('Permission denied', (
+        "Check file permissions for both input and output directories",
+        "Ensure the user has write access to the output directory",
+        "Try running with elevated permissions if necessary"
+    ), _HELP_AUDIO),
+    ('No space left on device', (
+        "Free up disk space on the system",
+        "Move files to a drive with more space",
+        "Clean up temporary files"
+    ), _HELP_AUDIO),
+    ('Invalid data', (
+        "Verify the input file is a valid audio/video file",
+        "Try opening the file in a media player to test it",
+        "Re-record or re-download the file if it's corrupted"
+    ), _HELP_AUDIO),
+))
+_AUDIO_UNKNOWN_OUTPUT = (
+    "Ensure FFmpeg is installed and accessible",
+    "Verify the input file format is supported",
+    "Check system resources (CPU, memory, disk space)"
+)
+_AUDIO_NO_OUTPUT = (
+    "Ensure FFmpeg is installed and in your system PATH",
+    "Verify the input file is a valid media file",
+    "Check available disk space and memory"
+)
+
+_TRANSCRIPTION_RULES = _RuleSet((
+    ('rate limit', (
+        "Wait a few minutes before retrying",
+        "Implement request throttling",
+        "Upgrade your OpenAI plan for higher rate limits"
+    ), _HELP_TRANSCRIPTION),
+    ('quota', (
+        "Check your OpenAI account billing and usage",
+        "Add credits to your OpenAI account",
+        "Wait for quota reset if on free tier"
+    ), _HELP_TRANSCRIPTION),
+    ('invalid', (
+        "Verify your OpenAI API key is correct",
+        "Check that your API key has Whisper access",
+        "Regenerate your API key if necessary"
+    ), _HELP_TRANSCRIPTION),
+    ('timeout', (
+        "Try splitting large audio files into smaller chunks",
+        "Check your internet connection stability",
+        "Retry the operation"
+    ), _HELP_TRANSCRIPTION),
+), re.IGNORECASE)
+_TRANSCRIPTION_NO_API_ERROR = (
+    "Verify your OpenAI API key is configured correctly",
+    "Check your internet connection",
+    "Ensure the audio file is in a supported format"
+)
+
+_ANALYSIS_RULES = _RuleSet((
+    ('rate limit', (
+        "Wait before retrying to respect rate limits",
+        "Implement exponential backoff",
+        "Consider upgrading your Anthropic plan"
+    ), _HELP_ANALYSIS),
+    ('context|token', (
+        "Try processing shorter transcript chunks",
+        "Summarize the transcript before analysis",
+        "Use a model with larger context window"
+    ), _HELP_ANALYSIS),
+    ('invalid', (
+        "Verify your Anthropic API key is correct",
+        "Check API key permissions and quota",
+        "Regenerate your API key if necessary"
+    ), _HELP_ANALYSIS),
+), re.IGNORECASE)
+_ANALYSIS_NO_API_ERROR = (
+    "Verify your Anthropic API key is configured correctly",
+    "Check your internet connection",
+    "Ensure the transcript is not empty"
+)
+
+# Exact-value lookups: key -> (solutions, help_url)
+_STORAGE_SOLUTIONS: Dict[Optional[str], Tuple[Tuple[str, ...], Optional[str]]] = {
+    "google_drive": ((
+        "Check Google Drive API credentials and permissions",
+        "Verify folder IDs are correct and accessible",
+        "Ensure sufficient Google Drive storage space",
+        "Check internet connection stability"
+    ), _HELP_GOOGLE_DRIVE),
+    "local": ((
+        "Check local file system permissions",
+        "Verify sufficient disk space",
+        "Ensure the Obsidian vault path is correct",
+        "Check that directories are writable"
+    ), None),
+}
+_STORAGE_DEFAULT = ((
+    "Verify storage configuration is correct",
+    "Check available disk space",
+    "Ensure proper file permissions"
+), None)
+
+_RESOURCE_SOLUTIONS: Dict[str, Tuple[str, ...]] = {
+    "memory": (
+        "Close other applications to free memory",
+        "Process smaller files or split large files",
+        "Restart the application to clear memory leaks",
+        "Consider upgrading system memory"
+    ),
+    "disk": (
+        "Free up disk space by deleting unnecessary files",
+        "Move processed files to external storage",
+        "Clean up temporary files",
+        "Consider expanding disk capacity"
+    ),
+    "cpu": (
+        "Close CPU-intensive applications",
+        "Process files sequentially instead of in parallel",
+        "Wait for other processes to complete"
+    ),
+}
+
+_NETWORK_STATUS_SOLUTIONS: Dict[int, Tuple[str, ...]] = {
+    429: (  # Rate limited
+        "Wait before retrying (rate limit exceeded)",
+        "Implement exponential backoff",
+        "Check your API plan limits"
+    ),
+    401: (  # Unauthorized
+        "Check your API key is correct",
+        "Verify API key permissions",
+        "Regenerate your API key if necessary"
+    ),
+    404: (  # Not found
+        "Verify the endpoint URL is correct",
+        "Check that the requested resource exists",
+        "Confirm API version compatibility"
+    ),
+}
+_NETWORK_SERVER_ERROR = (
+    "Retry the operation (server error)",
+    "Check service status page",
+    "Try again in a few minutes"
+)
+_NETWORK_NO_STATUS = (
+    "Check your internet connection",
+    "Verify DNS resolution is working",
+    "Try again in a few minutes",
+    "Check if you're behind a firewall or proxy"
+)
+
+
 class ConfigurationError(MeetingProcessorError):
     """Configuration validation errors with specific guidance"""
     
     def __init__(self, message: str, config_field: Optional[str] = None, 
                  expected_value: Optional[str] = None, current_value: Optional[str] = None):
-        solutions = []
+        solutions = ()
         details = None
+        help_url = None
         
         if config_field:
             details = f"Configuration field: {config_field}"
@@ -55,26 +275,10 @@ class ConfigurationError(MeetingProcessorError):
                 details += f" (current: {current_value}, expected: {expected_value})"
             
             # Add specific solutions based on common config issues
-            if "api_key" in config_field.lower():
-                solutions = [
-                    f"Set {config_field} in your .env file",
-                    "Ensure the API key is valid and has proper permissions",
-                    "Check that the .env file is in the correct directory"
-                ]
-                help_url = "https://docs.anthropic.com/claude-code/configuration"
-            elif "path" in config_field.lower():
-                solutions = [
-                    f"Verify that the path in {config_field} exists and is accessible",
-                    "Use absolute paths to avoid confusion",
-                    "Check file/directory permissions"
-                ]
-            elif "folder_id" in config_field.lower():
-                solutions = [
-                    "Verify the Google Drive folder ID is correct",
-                    "Ensure the service account has access to the folder",
-                    "Check that the folder exists and is not in Trash"
-                ]
-                help_url = "https://docs.anthropic.com/claude-code/google-drive"
+            matched = _CONFIG_RULES.classify(config_field)
+            if matched:
+                templates, help_url = matched
+                solutions = [s.format(field=config_field) for s in templates]
         
         super().__init__(message, details, solutions, help_url)
         self.config_field = config_field
@@ -98,48 +302,14 @@ class AudioProcessingError(ProcessingError):
     def __init__(self, message: str, filename: Optional[str] = None, 
                  ffmpeg_output: Optional[str] = None):
         # Parse ffmpeg errors for better solutions
-        solutions = []
         details = None
         
         if ffmpeg_output:
             details = f"FFmpeg output: {ffmpeg_output[:200]}..."
-            
-            if "No such file or directory" in ffmpeg_output:
-                solutions = [
-                    "Verify the input file exists and is accessible",
-                    "Check file permissions",
-                    "Ensure the file path doesn't contain special characters"
-                ]
-            elif "Permission denied" in ffmpeg_output:
-                solutions = [
-                    "Check file permissions for both input and output directories",
-                    "Ensure the user has write access to the output directory",
-                    "Try running with elevated permissions if necessary"
-                ]
-            elif "No space left on device" in ffmpeg_output:
-                solutions = [
-                    "Free up disk space on the system",
-                    "Move files to a drive with more space",
-                    "Clean up temporary files"
-                ]
-            elif "Invalid data" in ffmpeg_output:
-                solutions = [
-                    "Verify the input file is a valid audio/video file",
-                    "Try opening the file in a media player to test it",
-                    "Re-record or re-download the file if it's corrupted"
-                ]
-            else:
-                solutions = [
-                    "Ensure FFmpeg is installed and accessible",
-                    "Verify the input file format is supported",
-                    "Check system resources (CPU, memory, disk space)"
-                ]
+            matched = _AUDIO_RULES.classify(ffmpeg_output)
+            solutions = matched[0] if matched else _AUDIO_UNKNOWN_OUTPUT
         else:
-            solutions = [
-                "Ensure FFmpeg is installed and in your system PATH",
-                "Verify the input file is a valid media file",
-                "Check available disk space and memory"
-            ]
+            solutions = _AUDIO_NO_OUTPUT
         
         super().__init__(
             message, 
@@ -147,7 +317,7 @@ class AudioProcessingError(ProcessingError):
             stage="audio_conversion",
             details=details,
             solutions=solutions,
-            help_url="https://docs.anthropic.com/claude-code/troubleshooting#audio-issues"
+            help_url=_HELP_AUDIO
         )
         self.ffmpeg_output = ffmpeg_output
 
@@ -157,45 +327,17 @@ class TranscriptionError(ProcessingError):
     
     def __init__(self, message: str, filename: Optional[str] = None, 
                  api_error: Optional[str] = None, file_duration: Optional[float] = None):
-        solutions = []
         details = None
         
         if api_error:
             details = f"API Error: {api_error}"
-            
-            if "rate limit" in api_error.lower():
-                solutions = [
-                    "Wait a few minutes before retrying",
-                    "Implement request throttling",
-                    "Upgrade your OpenAI plan for higher rate limits"
-                ]
-            elif "quota" in api_error.lower():
-                solutions = [
-                    "Check your OpenAI account billing and usage",
-                    "Add credits to your OpenAI account",
-                    "Wait for quota reset if on free tier"
-                ]
-            elif "invalid" in api_error.lower():
-                solutions = [
-                    "Verify your OpenAI API key is correct",
-                    "Check that your API key has Whisper access",
-                    "Regenerate your API key if necessary"
-                ]
-            elif "timeout" in api_error.lower():
-                solutions = [
-                    "Try splitting large audio files into smaller chunks",
-                    "Check your internet connection stability",
-                    "Retry the operation"
-                ]
+            matched = _TRANSCRIPTION_RULES.classify(api_error)
+            solutions = matched[0] if matched else ()
         else:
-            solutions = [
-                "Verify your OpenAI API key is configured correctly",
-                "Check your internet connection",
-                "Ensure the audio file is in a supported format"
-            ]
+            solutions = _TRANSCRIPTION_NO_API_ERROR
         
         if file_duration and file_duration > 1800:  # 30 minutes
-            solutions.append("Consider splitting audio files longer than 30 minutes")
+            solutions += ("Consider splitting audio files longer than 30 minutes",)
         
         super().__init__(
             message,
@@ -203,7 +345,7 @@ class TranscriptionError(ProcessingError):
             stage="transcription",
             details=details,
             solutions=solutions,
-            help_url="https://docs.anthropic.com/claude-code/troubleshooting#transcription-issues"
+            help_url=_HELP_TRANSCRIPTION
         )
         self.api_error = api_error
         self.file_duration = file_duration
@@ -214,39 +356,17 @@ class AnalysisError(ProcessingError):
     
     def __init__(self, message: str, filename: Optional[str] = None, 
                  api_error: Optional[str] = None, transcript_length: Optional[int] = None):
-        solutions = []
         details = None
         
         if api_error:
             details = f"API Error: {api_error}"
-            
-            if "rate limit" in api_error.lower():
-                solutions = [
-                    "Wait before retrying to respect rate limits",
-                    "Implement exponential backoff",
-                    "Consider upgrading your Anthropic plan"
-                ]
-            elif "context" in api_error.lower() or "token" in api_error.lower():
-                solutions = [
-                    "Try processing shorter transcript chunks",
-                    "Summarize the transcript before analysis",
-                    "Use a model with larger context window"
-                ]
-            elif "invalid" in api_error.lower():
-                solutions = [
-                    "Verify your Anthropic API key is correct",
-                    "Check API key permissions and quota",
-                    "Regenerate your API key if necessary"
-                ]
+            matched = _ANALYSIS_RULES.classify(api_error)
+            solutions = matched[0] if matched else ()
         else:
-            solutions = [
-                "Verify your Anthropic API key is configured correctly",
-                "Check your internet connection",
-                "Ensure the transcript is not empty"
-            ]
+            solutions = _ANALYSIS_NO_API_ERROR
         
         if transcript_length and transcript_length > 100000:  # Very long transcript
-            solutions.append("Consider summarizing very long transcripts before analysis")
+            solutions += ("Consider summarizing very long transcripts before analysis",)
         
         super().__init__(
             message,
@@ -254,7 +374,7 @@ class AnalysisError(ProcessingError):
             stage="analysis",
             details=details,
             solutions=solutions,
-            help_url="https://docs.anthropic.com/claude-code/troubleshooting#analysis-issues"
+            help_url=_HELP_ANALYSIS
         )
         self.api_error = api_error
         self.transcript_length = transcript_length
@@ -265,30 +385,8 @@ class StorageError(ProcessingError):
     
     def __init__(self, message: str, filename: Optional[str] = None, 
                  storage_type: Optional[str] = None, operation: Optional[str] = None):
-        solutions = []
         details = f"Storage: {storage_type}, Operation: {operation}" if storage_type and operation else None
-        
-        if storage_type == "google_drive":
-            solutions = [
-                "Check Google Drive API credentials and permissions",
-                "Verify folder IDs are correct and accessible",
-                "Ensure sufficient Google Drive storage space",
-                "Check internet connection stability"
-            ]
-            help_url = "https://docs.anthropic.com/claude-code/google-drive"
-        elif storage_type == "local":
-            solutions = [
-                "Check local file system permissions",
-                "Verify sufficient disk space",
-                "Ensure the Obsidian vault path is correct",
-                "Check that directories are writable"
-            ]
-        else:
-            solutions = [
-                "Verify storage configuration is correct",
-                "Check available disk space",
-                "Ensure proper file permissions"
-            ]
+        solutions, help_url = _STORAGE_SOLUTIONS.get(storage_type, _STORAGE_DEFAULT)
         
         super().__init__(
             message,
@@ -307,38 +405,16 @@ class ResourceError(MeetingProcessorError):
     
     def __init__(self, message: str, resource_type: str, current_usage: Optional[str] = None,
                  threshold: Optional[str] = None):
-        solutions = []
         details = None
         
         if current_usage and threshold:
             details = f"{resource_type} usage: {current_usage} (threshold: {threshold})"
         
-        if resource_type == "memory":
-            solutions = [
-                "Close other applications to free memory",
-                "Process smaller files or split large files",
-                "Restart the application to clear memory leaks",
-                "Consider upgrading system memory"
-            ]
-        elif resource_type == "disk":
-            solutions = [
-                "Free up disk space by deleting unnecessary files",
-                "Move processed files to external storage",
-                "Clean up temporary files",
-                "Consider expanding disk capacity"
-            ]
-        elif resource_type == "cpu":
-            solutions = [
-                "Close CPU-intensive applications",
-                "Process files sequentially instead of in parallel",
-                "Wait for other processes to complete"
-            ]
-        
         super().__init__(
             message,
             details=details,
-            solutions=solutions,
-            help_url="https://docs.anthropic.com/claude-code/troubleshooting#resource-issues"
+            solutions=_RESOURCE_SOLUTIONS.get(resource_type, ()),
+            help_url=_HELP_RESOURCE
         )
         self.resource_type = resource_type
         self.current_usage = current_usage
@@ -350,7 +426,6 @@ class NetworkError(MeetingProcessorError):
     
     def __init__(self, message: str, service: Optional[str] = None, 
                  status_code: Optional[int] = None, retry_after: Optional[int] = None):
-        solutions = []
         details = None
         
         if service:
@@ -359,45 +434,20 @@ class NetworkError(MeetingProcessorError):
                 details += f", Status: {status_code}"
         
         if status_code:
-            if status_code == 429:  # Rate limited
-                solutions = [
-                    "Wait before retrying (rate limit exceeded)",
-                    "Implement exponential backoff",
-                    "Check your API plan limits"
-                ]
-                if retry_after:
-                    solutions.insert(0, f"Wait {retry_after} seconds before retrying")
-            elif status_code >= 500:  # Server error
-                solutions = [
-                    "Retry the operation (server error)",
-                    "Check service status page",
-                    "Try again in a few minutes"
-                ]
-            elif status_code == 401:  # Unauthorized
-                solutions = [
-                    "Check your API key is correct",
-                    "Verify API key permissions",
-                    "Regenerate your API key if necessary"
-                ]
-            elif status_code == 404:  # Not found
-                solutions = [
-                    "Verify the endpoint URL is correct",
-                    "Check that the requested resource exists",
-                    "Confirm API version compatibility"
-                ]
+            if status_code >= 500:  # Server error
+                solutions = _NETWORK_SERVER_ERROR
+            else:
+                solutions = _NETWORK_STATUS_SOLUTIONS.get(status_code, ())
+                if status_code == 429 and retry_after:
+                    solutions = (f"Wait {retry_after} seconds before retrying",) + solutions
         else:
-            solutions = [
-                "Check your internet connection",
-                "Verify DNS resolution is working",
-                "Try again in a few minutes",
-                "Check if you're behind a firewall or proxy"
-            ]
+            solutions = _NETWORK_NO_STATUS
         
         super().__init__(
             message,
             details=details,
             solutions=solutions,
-            help_url="https://docs.anthropic.com/claude-code/troubleshooting#network-issues"
+            help_url=_HELP_NETWORK
         )
         self.service = service
         self.status_code = status_code
@@ -405,45 +455,58 @@ class NetworkError(MeetingProcessorError):
 
 
 # Error reporting utilities
+
+# Maps keywords in generic exception messages to the matching error class;
+# alternatives are ordered so earlier sources take precedence
+_ERROR_SOURCE_PATTERN = re.compile(
+    r'\A(?:(?=.*?(?P<audio>ffmpeg))|(?=.*?(?P<transcription>openai|whisper))'
+    r'|(?=.*?(?P<analysis>anthropic|claude)))',
+    re.IGNORECASE | re.DOTALL
+)
+_ERROR_SOURCE_CLASSES = {
+    'audio': AudioProcessingError,
+    'transcription': TranscriptionError,
+    'analysis': AnalysisError,
+}
+
 def create_error_report(error: MeetingProcessorError, context: Optional[Dict[str, Any]] = None) -> str:
     """Create a detailed error report for user debugging"""
-    from datetime import datetime
-    
-    report_data = error.get_error_report()
-    
-    # Add context information
-    if context:
-        report_data['context'] = context
+    # Read fields straight off the error rather than via get_error_report()
+    details = error.details
+    solutions = error.solutions
+    help_url = error.help_url
     
     # Generate markdown report
-    content = f"""# Meeting Processor Error Report
+    buf = io.StringIO()
+    buf.write(f"""# Meeting Processor Error Report
 
 ## Error Information
-- **Type:** {report_data['error_type']}
-- **Message:** {report_data['message']}
-- **Time:** {datetime.now().isoformat()}
+- **Type:** {type(error).__name__}
+- **Message:** {error.message}
+- **Time:** {_now().isoformat()}
 
-"""
+""")
     
-    if report_data.get('details'):
-        content += f"## Details\n{report_data['details']}\n\n"
+    if details:
+        buf.write(f"## Details\n{details}\n\n")
     
-    if report_data.get('solutions'):
-        content += "## Recommended Solutions\n"
-        for i, solution in enumerate(report_data['solutions'], 1):
-            content += f"{i}. {solution}\n"
-        content += "\n"
+    if solutions:
+        buf.write("## Recommended Solutions\n")
+        for i, solution in enumerate(solutions, 1):
+            buf.write(f"{i}. {solution}\n")
+        buf.write("\n")
     
+    # Add context information
     if context:
-        content += "## Context Information\n"
+        buf.write("## Context Information\n")
         for key, value in context.items():
-            content += f"- **{key.replace('_', ' ').title()}:** {value}\n"
-        content += "\n"
+            buf.write(f"- **{key.replace('_', ' ').title()}:** {value}\n")
+        buf.write("\n")
     
-    if report_data.get('help_url'):
-        content += f"## Additional Help\nFor more information, see: {report_data['help_url']}\n\n"
+    if help_url:
+        buf.write(f"## Additional Help\nFor more information, see: {help_url}\n\n")
     
-    content += """## Next Steps
+    buf.write("""## Next Steps
 1. Review the error message and details above
 2. Try the recommended solutions in order
 3. Check system resources (disk space, memory, network)
@@ -452,39 +515,33 @@ def create_error_report(error: MeetingProcessorError, context: Optional[Dict[str
 
 ---
 *Generated by Meeting Processor Error Reporting System*
-"""
+""")
     
-    return content
+    return buf.getvalue()
 
 
 def handle_error_with_report(error: Exception, filename: str, output_dir: str, 
                            context: Optional[Dict[str, Any]] = None) -> str:
     """Handle an error and create a detailed report file"""
-    import os
-    from pathlib import Path
-    
     # Convert to MeetingProcessorError if needed
     if not isinstance(error, MeetingProcessorError):
-        if "ffmpeg" in str(error).lower():
-            error = AudioProcessingError(str(error), filename)
-        elif "openai" in str(error).lower() or "whisper" in str(error).lower():
-            error = TranscriptionError(str(error), filename)
-        elif "anthropic" in str(error).lower() or "claude" in str(error).lower():
-            error = AnalysisError(str(error), filename)
+        message = str(error)
+        match = _ERROR_SOURCE_PATTERN.search(message)
+        if match is None:
+            error = MeetingProcessorError(message)
         else:
-            error = MeetingProcessorError(str(error))
+            error = _ERROR_SOURCE_CLASSES[match.lastgroup](message, filename)
     
     # Create error report
     report_content = create_error_report(error, context)
     
     # Save to file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_filename = filename.replace('.', '_').replace(' ', '_')
-    report_filename = f"ERROR-{error.__class__.__name__}-{safe_filename}-{timestamp}.md"
+    report_filename = (f"ERROR-{type(error).__name__}-{filename.translate(_SAFE_FN_TABLE)}"
+                       f"-{_now().strftime(_TS_FMT)}.md")
     
     report_path = Path(output_dir) / report_filename
     try:
-        report_path.write_text(report_content, encoding="utf-8")
+        report_path.write_bytes(report_content.encode("utf-8"))
         return str(report_path)
     except Exception:
         return ""  # Couldn't save report
\ No newline at end of file
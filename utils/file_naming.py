@@ -5,13 +5,66 @@ Generates human-readable filenames with extracted metadata
 
 import re
 import json
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
 from utils.logger import LoggerMixin
 
 
+# Topic indicators searched for in the analysis text, in priority order
+_TOPIC_PATTERNS = [
+    re.compile(r'(?:topic|subject|regarding|about):\s*([^\n.]+)', re.IGNORECASE),
+    re.compile(r'(?:meeting\s+about|discussing)\s+([^\n.]+)', re.IGNORECASE),
+    re.compile(r'(?:^|\n)(?:topic|subject):\s*([^\n]+)', re.IGNORECASE),
+    re.compile(r'(?:^|\n)\*\*(?:topic|subject)\*\*:?\s*([^\n]+)', re.IGNORECASE)
+]
+
+# Filename/topic cleanup patterns
+_FILENAME_PREFIX_RE = re.compile(r'^(meeting|call|session|zoom|teams)[-_\s]*', re.IGNORECASE)
+_FILENAME_SUFFIX_RE = re.compile(r'[-_\s]*(recording|rec|audio|video)$', re.IGNORECASE)
+_SEPARATOR_RE = re.compile(r'[_-]+')
+_WS_RE = re.compile(r'\s+')
+_MD_BOLD_RE = re.compile(r'\*\*([^*]+)\*\*')
+_MD_ITAL_RE = re.compile(r'\*([^*]+)\*')
+
+# Recordings whose filename already states the meeting type, e.g. "standup_0105.mp4"
+_FILENAME_TYPE_RE = re.compile(
+    r'^(standup|retro|retrospective|planning|demo|interview|onboarding|review)[-_\s]',
+    re.IGNORECASE
+)
+_FILENAME_TYPE_ALIASES = {'retro': 'retrospective'}
+
+# Meeting types whose naming strategy ignores urgency, importance and content flags
+_SELF_NAMED_TYPES = frozenset({'standup', 'retrospective', 'planning', 'demo', 'interview'})
+
+# Importance scoring tables
+_URGENCY_SCORES = {'critical': 3, 'high': 2, 'normal': 0, 'low': -1}
+_IMPORTANT_TYPES = frozenset({'client_call', 'demo', 'planning', 'retrospective', 'interview'})
+
+# Words always uppercased in topics derived from filenames
+_ACRONYMS = frozenset({'api', 'ui', 'db', 'sql', 'ai', 'ml', 'ci', 'cd'})
+
+# Filename sanitization patterns
+_INVALID_CHARS_TABLE = str.maketrans('', '', '<>:"/\\|?*')
+_NONWORD_RE = re.compile(r'[^\w\s-]')  # Also covers every invalid filename character
+_UNDERSCORE_RUN_RE = re.compile(r'[\s_]+')
+_REPEATED_SEPARATOR_RE = re.compile(r'([._])\1+')
+
+# Content indicators matched as plain substrings of the lowercased analysis
+_DECISION_INDICATORS = [
+    'decided', 'decision', 'agreed', 'concluded', 'resolved',
+    'approved', 'selected', 'chosen', 'finalized'
+]
+_ACTION_INDICATORS = [
+    'action item', 'todo', 'to do', 'follow up', 'next step',
+    'assigned', 'responsible', 'will do', 'task', 'homework'
+]
+_DECISION_RE = re.compile('|'.join(map(re.escape, _DECISION_INDICATORS)))
+_ACTION_RE = re.compile('|'.join(map(re.escape, _ACTION_INDICATORS)))
+
+
 def ensure_string(value, fallback=""):
     """Ensure value is a string, with intelligent dict handling"""
     if isinstance(value, str):
@@ -28,15 +81,15 @@ def ensure_string(value, fallback=""):
         return str(value)
 
 
-@dataclass
+@dataclass(slots=True)
 class MeetingMetadata:
     """Extracted metadata from meeting content"""
     topic: str = ""
-    participants: List[str] = field(default_factory=list)
+    participants: Tuple[str, ...] = ()
     meeting_type: str = ""
     duration_minutes: int = 0
-    technologies: List[str] = field(default_factory=list)
-    companies: List[str] = field(default_factory=list)
+    technologies: Tuple[str, ...] = ()
+    companies: Tuple[str, ...] = ()
     urgency: str = "normal"  # critical, high, normal, low
     has_decisions: bool = False
     has_action_items: bool = False
@@ -110,16 +163,57 @@ class SmartFileNamer(LoggerMixin):
                 r'\blow\s+priority\b'
             ]
         }
+        
+        # Compile all categories into one named-group regex so detection is
+        # a single scan of the search text
+        self._meeting_type_master = self._build_category_regex(self.meeting_type_patterns)
+        self._urgency_master = self._build_category_regex(self.urgency_patterns)
+        self._meeting_type_priority = {name: i for i, name in enumerate(self.meeting_type_patterns)}
+        self._urgency_priority = {name: i for i, name in enumerate(self.urgency_patterns)}
+    
+    @staticmethod
+    def _build_category_regex(category_patterns: Dict[str, List[str]]) -> re.Pattern:
+        """Compile category patterns into one regex with a named group per category"""
+        groups = '|'.join(
+            f'(?P<{category}>' + '|'.join(f'(?:{p})' for p in patterns) + ')'
+            for category, patterns in category_patterns.items()
+        )
+        # Zero-width lookahead so overlapping matches of different categories
+        # are all reported instead of being consumed by an earlier match.
+        # When every pattern begins at a word boundary, test that first so the
+        # full alternation is only attempted at the start of words.
+        # Callers lowercase the search text, so no IGNORECASE is needed.
+        anchor = r'\b' if all(
+            p.startswith(r'\b') for patterns in category_patterns.values() for p in patterns
+        ) else ''
+        return re.compile(f'{anchor}(?=(?:{groups}))')
+    
+    @staticmethod
+    def _first_matching_category(regex: re.Pattern, priority: Dict[str, int],
+                                 text: str) -> Optional[str]:
+        """Return the highest-priority category found anywhere in text"""
+        best = None
+        for match in regex.finditer(text):
+            category = match.lastgroup
+            if best is None or priority[category] < priority[best]:
+                best = category
+                if priority[best] == 0:
+                    break
+        return best
     
     def generate_filename(self, analysis: Dict[str, Any], original_name: str, 
-                         transcript: str = "") -> str:
+                         transcript: str = "", now: Optional[datetime] = None) -> str:
         """Generate smart filename from meeting analysis"""
+        # Read the clock once so every timestamp in the name agrees
+        if now is None:
+            now = datetime.now()
+        
         try:
             # Extract metadata from content
             metadata = self._extract_metadata(analysis, transcript, original_name)
             
             # Generate components for filename
-            components = self._build_filename_components(metadata, original_name)
+            components = self._build_filename_components(metadata, original_name, now)
             
             # Apply naming strategy based on meeting type and importance
             filename = self._apply_naming_strategy(components, metadata)
@@ -132,7 +226,7 @@ class SmartFileNamer(LoggerMixin):
             
         except Exception as e:
             self.logger.warning(f"Error generating smart filename: {e}")
-            return self._fallback_filename(original_name)
+            return self._fallback_filename(original_name, now)
     
     def _extract_metadata(self, analysis: Dict[str, Any], transcript: str, 
                          original_name: str) -> MeetingMetadata:
@@ -145,42 +239,60 @@ class SmartFileNamer(LoggerMixin):
         # Extract participants
         metadata.participants = self._extract_participants(analysis)
         
-        # Detect meeting type
-        metadata.meeting_type = self._detect_meeting_type(analysis, transcript, original_name)
-        
         # Estimate duration from transcript length
         metadata.duration_minutes = self._estimate_duration(transcript)
         
         # Extract technologies and companies from entities
         entities = analysis.get('entities', {})
-        metadata.technologies = entities.get('technologies', [])[:3]  # Limit to top 3
-        metadata.companies = entities.get('companies', [])[:2]  # Limit to top 2
+        metadata.technologies = tuple(entities.get('technologies', [])[:3])  # Limit to top 3
+        metadata.companies = tuple(entities.get('companies', [])[:2])  # Limit to top 2
         
-        # Detect urgency and importance
-        metadata.urgency = self._detect_urgency(analysis, transcript)
-        metadata.estimated_importance = self._estimate_importance(metadata, analysis)
+        # Trust a meeting type stated in the filename and skip the content scans
+        # its naming strategy would not use
+        filename_type = self._meeting_type_from_filename(original_name)
+        if filename_type:
+            metadata.meeting_type = filename_type
+            if filename_type in _SELF_NAMED_TYPES:
+                return metadata
+        
+        # Lowercase the analysis text once and share it across all keyword scans
+        analysis_text = analysis.get('analysis', '').lower()
+        transcript_head = transcript[:1000]  # First 1000 chars of transcript
+        
+        # Detect meeting type
+        if not filename_type:
+            type_search_text = f"{analysis_text} {transcript_head.lower()} {original_name.lower()}"
+            metadata.meeting_type = self._detect_meeting_type(
+                type_search_text, participant_count=len(metadata.participants)
+            )
         
         # Check for key content types
-        metadata.has_decisions = self._has_decisions(analysis)
-        metadata.has_action_items = self._has_action_items(analysis)
+        metadata.has_decisions = self._has_decisions(analysis_text)
+        metadata.has_action_items = self._has_action_items(analysis_text)
+        
+        # Detect urgency and importance (importance scores the content flags above)
+        urgency_search_text = f"{analysis_text} {transcript_head[:500].lower()}"
+        metadata.urgency = self._detect_urgency(urgency_search_text)
+        metadata.estimated_importance = self._estimate_importance(metadata, analysis)
         
         return metadata
     
+    def _meeting_type_from_filename(self, filename: str) -> Optional[str]:
+        """Return the meeting type stated by a filename prefix, if any"""
+        match = _FILENAME_TYPE_RE.match(filename)
+        if not match:
+            return None
+        prefix = match.group(1).lower()
+        return _FILENAME_TYPE_ALIASES.get(prefix, prefix)
+    
     def _extract_topic(self, analysis: Dict[str, Any], original_name: str) -> str:
         """Extract main topic from analysis or filename"""
         # Try to extract from analysis summary
         analysis_text = analysis.get('analysis', '')
         if analysis_text:
             # Look for topic indicators
-            topic_patterns = [
-                r'(?:topic|subject|regarding|about):\s*([^\n.]+)',
-                r'(?:meeting\s+about|discussing)\s+([^\n.]+)',
-                r'(?:^|\n)(?:topic|subject):\s*([^\n]+)',
-                r'(?:^|\n)\*\*(?:topic|subject)\*\*:?\s*([^\n]+)'
-            ]
-            
-            for pattern in topic_patterns:
-                match = re.search(pattern, analysis_text, re.IGNORECASE)
+            for pattern in _TOPIC_PATTERNS:
+                match = pattern.search(analysis_text)
                 if match:
                     topic = match.group(1).strip()
                     if len(topic) > 5 and len(topic) < 100:  # Reasonable topic length
@@ -193,12 +305,12 @@ class SmartFileNamer(LoggerMixin):
         """Extract topic from original filename"""
         # Remove extension and common prefixes
         name = Path(filename).stem
-        name = re.sub(r'^(meeting|call|session|zoom|teams)[-_\s]*', '', name, flags=re.IGNORECASE)
-        name = re.sub(r'[-_\s]*(recording|rec|audio|video)$', '', name, flags=re.IGNORECASE)
+        name = _FILENAME_PREFIX_RE.sub('', name)
+        name = _FILENAME_SUFFIX_RE.sub('', name)
         
         # Clean up and format
-        name = re.sub(r'[_-]+', ' ', name)
-        name = re.sub(r'\s+', ' ', name).strip()
+        name = _SEPARATOR_RE.sub(' ', name)
+        name = _WS_RE.sub(' ', name).strip()
         
         # Capitalize words appropriately
         words = name.split()
@@ -206,12 +318,13 @@ class SmartFileNamer(LoggerMixin):
             # Keep first word capitalized, be smart about others
             formatted_words = [words[0].capitalize()]
             for word in words[1:]:
-                if word.lower() in ['api', 'ui', 'db', 'sql', 'ai', 'ml', 'ci', 'cd']:
-                    formatted_words.append(word.upper())
+                lowered = word.lower()
+                if lowered in _ACRONYMS:
+                    formatted_words.append(lowered.upper())
                 elif len(word) > 3:
                     formatted_words.append(word.capitalize())
                 else:
-                    formatted_words.append(word.lower())
+                    formatted_words.append(lowered)
             return ' '.join(formatted_words)
         
         return name or "Meeting"
@@ -219,12 +332,12 @@ class SmartFileNamer(LoggerMixin):
     def _clean_topic(self, topic: str) -> str:
         """Clean and format topic string"""
         # Remove markdown formatting
-        topic = re.sub(r'\*\*([^*]+)\*\*', r'\1', topic)
-        topic = re.sub(r'\*([^*]+)\*', r'\1', topic)
+        topic = _MD_BOLD_RE.sub(r'\1', topic)
+        topic = _MD_ITAL_RE.sub(r'\1', topic)
         
         # Remove excess whitespace and punctuation
-        topic = re.sub(r'[.,:;]+$', '', topic)
-        topic = re.sub(r'\s+', ' ', topic).strip()
+        topic = topic.rstrip('.,:;')
+        topic = _WS_RE.sub(' ', topic).strip()
         
         # Limit length
         if len(topic) > 60:
@@ -232,35 +345,23 @@ class SmartFileNamer(LoggerMixin):
         
         return topic or "Meeting"
     
-    def _extract_participants(self, analysis: Dict[str, Any]) -> List[str]:
+    def _extract_participants(self, analysis: Dict[str, Any]) -> Tuple[str, ...]:
         """Extract participant names from analysis"""
-        participants = []
-        
         # From entities
         entities = analysis.get('entities', {})
         people = entities.get('people', [])
-        participants.extend(people[:5])  # Limit to 5 people
-        
-        return participants
+        return tuple(people[:5])  # Limit to 5 people
     
-    def _detect_meeting_type(self, analysis: Dict[str, Any], transcript: str, 
-                           filename: str) -> str:
-        """Detect meeting type from content"""
-        # Combine text sources for analysis
-        search_text = ' '.join([
-            analysis.get('analysis', ''),
-            transcript[:1000],  # First 1000 chars of transcript
-            filename
-        ]).lower()
-        
+    def _detect_meeting_type(self, search_text: str, participant_count: int) -> str:
+        """Detect meeting type from lowercased analysis, transcript and filename text"""
         # Check patterns for each meeting type
-        for meeting_type, patterns in self.meeting_type_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, search_text, re.IGNORECASE):
-                    return meeting_type
+        meeting_type = self._first_matching_category(
+            self._meeting_type_master, self._meeting_type_priority, search_text
+        )
+        if meeting_type:
+            return meeting_type
         
         # Default classification based on participant count
-        participant_count = len(self._extract_participants(analysis))
         if participant_count == 2:
             return "one_on_one"
         elif participant_count > 8:
@@ -273,51 +374,35 @@ class SmartFileNamer(LoggerMixin):
         if not transcript:
             return 0
         
-        # Rough estimation: ~150 words per minute of speech
-        word_count = len(transcript.split())
+        # Rough estimation: ~150 words per minute of speech. Counting spaces
+        # avoids building a list of every word just to measure its length.
+        word_count = transcript.count(' ') + 1
         return max(1, round(word_count / 150))
     
-    def _detect_urgency(self, analysis: Dict[str, Any], transcript: str) -> str:
-        """Detect urgency level from content"""
-        search_text = f"{analysis.get('analysis', '')} {transcript[:500]}".lower()
-        
-        for urgency, patterns in self.urgency_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, search_text, re.IGNORECASE):
-                    return urgency
-        
-        return "normal"
+    def _detect_urgency(self, search_text: str) -> str:
+        """Detect urgency level from lowercased analysis and transcript text"""
+        urgency = self._first_matching_category(
+            self._urgency_master, self._urgency_priority, search_text
+        )
+        return urgency or "normal"
     
     def _estimate_importance(self, metadata: MeetingMetadata, analysis: Dict[str, Any]) -> str:
         """Estimate overall meeting importance"""
-        score = 0
-        
-        # Urgency contributes to importance
-        urgency_scores = {'critical': 3, 'high': 2, 'normal': 0, 'low': -1}
-        score += urgency_scores.get(metadata.urgency, 0)
-        
-        # Meeting type importance
-        important_types = ['client_call', 'demo', 'planning', 'retrospective', 'interview']
-        if metadata.meeting_type in important_types:
+        # Urgency and meeting type
+        score = _URGENCY_SCORES.get(metadata.urgency, 0)
+        if metadata.meeting_type in _IMPORTANT_TYPES:
             score += 2
         
         # Content indicators
-        if metadata.has_decisions:
-            score += 2
-        if metadata.has_action_items:
-            score += 1
+        score += 2 * metadata.has_decisions + metadata.has_action_items
         
         # Participant count (more people = potentially more important)
-        if len(metadata.participants) >= 5:
-            score += 1
-        elif len(metadata.participants) >= 8:
-            score += 2
+        participant_count = len(metadata.participants)
+        score += 2 if participant_count >= 8 else 1 if participant_count >= 5 else 0
         
         # Duration (longer meetings might be more important)
-        if metadata.duration_minutes >= 60:
-            score += 1
-        elif metadata.duration_minutes >= 120:
-            score += 2
+        duration = metadata.duration_minutes
+        score += 2 if duration >= 120 else 1 if duration >= 60 else 0
         
         # Convert score to importance level
         if score >= 4:
@@ -327,33 +412,22 @@ class SmartFileNamer(LoggerMixin):
         else:
             return "medium"
     
-    def _has_decisions(self, analysis: Dict[str, Any]) -> bool:
-        """Check if meeting contains decisions"""
-        text = analysis.get('analysis', '').lower()
-        decision_indicators = [
-            'decided', 'decision', 'agreed', 'concluded', 'resolved',
-            'approved', 'selected', 'chosen', 'finalized'
-        ]
-        return any(indicator in text for indicator in decision_indicators)
+    def _has_decisions(self, analysis_text: str) -> bool:
+        """Check if lowercased analysis text contains decisions"""
+        return _DECISION_RE.search(analysis_text) is not None
     
-    def _has_action_items(self, analysis: Dict[str, Any]) -> bool:
-        """Check if meeting contains action items"""
-        text = analysis.get('analysis', '').lower()
-        action_indicators = [
-            'action item', 'todo', 'to do', 'follow up', 'next step',
-            'assigned', 'responsible', 'will do', 'task', 'homework'
-        ]
-        return any(indicator in text for indicator in action_indicators)
+    def _has_action_items(self, analysis_text: str) -> bool:
+        """Check if lowercased analysis text contains action items"""
+        return _ACTION_RE.search(analysis_text) is not None
     
     def _build_filename_components(self, metadata: MeetingMetadata, 
-                                 original_name: str) -> Dict[str, str]:
+                                 original_name: str, now: datetime) -> Dict[str, str]:
         """Build filename components from metadata"""
-        now = datetime.now()
         
         components = {
             'topic': self._sanitize_filename_part(metadata.topic),
-            'date': now.strftime("%Y-%m-%d"),
-            'time': now.strftime("%H%M"),
+            'date': f"{now.year:04d}-{now.month:02d}-{now.day:02d}",
+            'time': f"{now.hour:02d}{now.minute:02d}",
             'type': metadata.meeting_type,
             'duration': f"{metadata.duration_minutes}min" if metadata.duration_minutes > 0 else "",
             'participants': f"{len(metadata.participants)}p" if metadata.participants else "",
@@ -430,12 +504,9 @@ class SmartFileNamer(LoggerMixin):
         if not text:
             return ""
         
-        # Remove/replace invalid characters
-        text = re.sub(r'[<>:"/\\|?*]', '', text)
-        text = re.sub(r'[^\w\s-]', '', text)
-        text = re.sub(r'\s+', '_', text)
-        text = re.sub(r'_{2,}', '_', text)
-        text = text.strip('_')
+        # Remove invalid characters, then collapse whitespace/underscore runs
+        text = _NONWORD_RE.sub('', text)
+        text = _UNDERSCORE_RUN_RE.sub('_', text).strip('_')
         
         # Limit length
         if len(text) > 40:
@@ -450,9 +521,8 @@ class SmartFileNamer(LoggerMixin):
             filename += '.md'
         
         # Remove invalid characters
-        filename = re.sub(r'[<>:"/\\|?*]', '', filename)
-        filename = re.sub(r'\.{2,}', '.', filename)  # Multiple dots
-        filename = re.sub(r'_{2,}', '_', filename)   # Multiple underscores
+        filename = filename.translate(_INVALID_CHARS_TABLE)
+        filename = _REPEATED_SEPARATOR_RE.sub(r'\1', filename)  # Multiple dots/underscores
         
         # Ensure reasonable length
         if len(filename) > 100:
@@ -460,27 +530,35 @@ class SmartFileNamer(LoggerMixin):
             filename = name_part[:97] + '.md'
         
         # Ensure it doesn't start with special characters
-        filename = re.sub(r'^[._-]+', '', filename)
+        filename = filename.lstrip('._-')
         
         return filename or "Meeting.md"
     
-    def _fallback_filename(self, original_name: str) -> str:
+    def _fallback_filename(self, original_name: str, now: Optional[datetime] = None) -> str:
         """Generate fallback filename if smart naming fails"""
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H%M")
+        if now is None:
+            now = datetime.now()
+        timestamp = f"{now.year:04d}-{now.month:02d}-{now.day:02d}_{now.hour:02d}{now.minute:02d}"
         safe_name = self._sanitize_filename_part(Path(original_name).stem)
         return f"{safe_name}_{timestamp}.md"
 
 
 # Global file namer instance
 _global_file_namer = None
+_file_namer_lock = threading.Lock()
 
 
 def get_file_namer(settings) -> SmartFileNamer:
     """Get the global file namer instance"""
     global _global_file_namer
-    if _global_file_namer is None:
-        _global_file_namer = SmartFileNamer(settings)
-    return _global_file_namer
+    namer = _global_file_namer
+    if namer is None:
+        # Pattern compilation makes construction non-trivial; build it only once
+        with _file_namer_lock:
+            if _global_file_namer is None:
+                _global_file_namer = SmartFileNamer(settings)
+            namer = _global_file_namer
+    return namer
 
 
 def generate_smart_filename(analysis: Dict[str, Any], original_name: str, 
@@ -3,23 +3,173 @@ Intelligent Caching System for Meeting Processor
 Caches AI analysis results and detects similar meetings for reuse
 """
 
+import re
 import json
+import atexit
+import heapq
 import hashlib
+import sys
+import queue
 import pickle
+import sqlite3
+import zlib
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterable, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass, asdict
 from utils.logger import LoggerMixin, log_success, log_warning
+from utils.resource_manager import register_lru_cache
+
+
+# Transcript normalization and keyword tokenization patterns
+_TIMESTAMP_RE = re.compile(r'\b\d{1,2}:\d{2}(?::\d{2})?\b')
+_SPEAKER_RE = re.compile(r'\b(?:speaker|participant)\s*\d+\b')
+_WS_RE = re.compile(r'\s+')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+# ASCII equivalent of _PUNCT_RE as a translate table
+_ASCII_PUNCT_TABLE = str.maketrans({
+    chr(code): ' ' for code in range(128)
+    if not (chr(code).isalnum() or chr(code) == '_' or chr(code).isspace())
+})
+
+# Common stop words to exclude from keywords
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of',
+    'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
+    'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
+    'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'its', 'our',
+    'their', 'what', 'which', 'who', 'when', 'where', 'why', 'how', 'all', 'any',
+    'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
+    'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 'can', 'just',
+    'now', 'really', 'also', 'like', 'well', 'get', 'go', 'know', 'think', 'see',
+    'want', 'need', 'going', 'make', 'take', 'come', 'good', 'great', 'right',
+    'okay', 'yeah', 'yes', 'thanks', 'thank', 'please'
+})
+
+
+# Filler words that never make useful keywords
+_FILLER_WORDS = frozenset({'um', 'uh', 'uhm', 'hmm', 'mmm', 'err'})
+
+# Keywords kept per cache entry for similarity matching
+_MAX_KEYWORDS = 50
+
+# Keyword bit positions are renumbered once more than twice the live
+# vocabulary (and at least this many) have been handed out
+_MIN_KEYWORD_BITS = 256
+
+# Transcripts flow through get_cached_analysis and then cache_analysis, so
+# the hash and tokens of recent texts are memoized to compute them only once
+_TEXT_MEMO_SIZE = 32
+
+# Characters encoded per hash update, bounding the transient UTF-8 copy
+_HASH_CHUNK_CHARS = 64 * 1024
+
+# Per-entry files of the old JSON cache layout, named by transcript hash
+_ENTRY_FILE_RE = re.compile(r'[0-9a-f]{64}\.json')
+
+
+def _normalize_transcript(transcript: str) -> str:
+    """Normalize transcript for consistent comparison"""
+    # Convert to lowercase
+    text = transcript.lower()
+    
+    # Remove timestamps and speaker indicators
+    text = _TIMESTAMP_RE.sub('', text)
+    text = _SPEAKER_RE.sub('', text)
+    
+    # Remove extra whitespace
+    return _WS_RE.sub(' ', text).strip()
+
+
+@register_lru_cache
+@lru_cache(maxsize=_TEXT_MEMO_SIZE)
+def _transcript_hash(transcript: str) -> str:
+    """SHA-256 of the normalized transcript"""
+    normalized = _normalize_transcript(transcript)
+    digest = hashlib.sha256()
+    for start in range(0, len(normalized), _HASH_CHUNK_CHARS):
+        digest.update(normalized[start:start + _HASH_CHUNK_CHARS].encode('utf-8'))
+    return digest.hexdigest()
+
+
+@register_lru_cache
+@lru_cache(maxsize=_TEXT_MEMO_SIZE)
+def _text_keywords(text: str) -> Tuple[str, ...]:
+    """Keyword tokens of text, in order of occurrence"""
+    # Convert to lowercase and remove punctuation; the translate table only
+    # covers ASCII, so other text goes through the regex
+    text = text.lower()
+    if text.isascii():
+        words = text.translate(_ASCII_PUNCT_TABLE).split()
+    else:
+        words = _PUNCT_RE.sub(' ', text).split()
+    
+    # Filter words, excluding very long ones
+    return tuple(
+        word for word in words
+        if 2 < len(word) < 20 and word not in _STOP_WORDS and not word.isdigit()
+    )
+
+
+def _is_keyword(word: str) -> bool:
+    """Whether a lowercase token is usable as a similarity keyword"""
+    return 3 <= len(word) <= 20 and not word.isdigit() and word not in _FILLER_WORDS
+
+
+def _dump_json(data: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON in a single C-encoder pass"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _pack_payload(data: Dict[str, Any]) -> bytes:
+    """Serialize an entry payload as zlib-compressed JSON"""
+    return zlib.compress(_dump_json(data))
+
+
+def _unpack_payload(blob: bytes) -> Dict[str, Any]:
+    """Inverse of _pack_payload; rows written before compression hold plain JSON"""
+    if blob[:1] == b'{':
+        return json.loads(blob)
+    return json.loads(zlib.decompress(blob))
+
+
+# One row per cache entry; the payload holds analysis, entities and metadata
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    transcript_hash TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    last_accessed TEXT,
+    access_count INTEGER NOT NULL DEFAULT 0,
+    file_size INTEGER NOT NULL DEFAULT 0,
+    keywords TEXT NOT NULL,
+    payload BLOB NOT NULL
+)
+"""
+_INSERT_ENTRY_SQL = "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?)"
+_UPDATE_ACCESS_SQL = "UPDATE cache_entries SET access_count = ?, last_accessed = ? WHERE transcript_hash = ?"
+_SELECT_SUMMARIES_SQL = (
+    "SELECT transcript_hash, created_at, last_accessed, access_count, file_size, keywords FROM cache_entries"
+)
+_SELECT_PAYLOAD_SQL = "SELECT payload FROM cache_entries WHERE transcript_hash = ?"
+_DELETE_ENTRY_SQL = "DELETE FROM cache_entries WHERE transcript_hash = ?"
 
 
 @dataclass
 class CacheEntry:
-    """Represents a cached analysis entry"""
+    """Represents a cached analysis entry
+    
+    Entries loaded from the index start out without their payload
+    (analysis, entities, metadata are None) until first accessed.
+    """
     transcript_hash: str
-    analysis: Dict[str, Any]
-    entities: Dict[str, List[str]]
-    metadata: Dict[str, Any]
+    analysis: Optional[Dict[str, Any]]
+    entities: Optional[Dict[str, List[str]]]
+    metadata: Optional[Dict[str, Any]]
     created_at: datetime
     access_count: int = 0
     last_accessed: Optional[datetime] = None
@@ -40,12 +190,49 @@ class CacheEntry:
         if data['last_accessed']:
             data['last_accessed'] = datetime.fromisoformat(data['last_accessed'])
         return cls(**data)
+    
+    def to_row(self) -> Tuple:
+        """Database row for this entry, payload included"""
+        return (
+            self.transcript_hash,
+            self.created_at.isoformat(),
+            self.last_accessed.isoformat() if self.last_accessed else None,
+            self.access_count,
+            self.file_size,
+            _dump_json(self.similarity_keywords or []),
+            _pack_payload({'analysis': self.analysis, 'entities': self.entities, 'metadata': self.metadata})
+        )
+    
+    @classmethod
+    def from_summary_row(cls, row: Tuple) -> 'CacheEntry':
+        """Create a payload-less entry from a summary row"""
+        transcript_hash, created_at, last_accessed, access_count, file_size, keywords = row
+        return cls(
+            transcript_hash=transcript_hash,
+            analysis=None,
+            entities=None,
+            metadata=None,
+            created_at=datetime.fromisoformat(created_at),
+            access_count=access_count,
+            last_accessed=datetime.fromisoformat(last_accessed) if last_accessed else None,
+            similarity_keywords=[sys.intern(keyword) for keyword in json.loads(keywords)],
+            file_size=file_size
+        )
 
 
 class IntelligentCache(LoggerMixin):
     """Intelligent caching system with similarity detection and automatic cleanup"""
     
-    def __init__(self, cache_dir: Path, max_entries: int = 1000, max_age_days: int = 30):
+    # Write-behind persistence: dirty entries are written in one transaction
+    # after a short delay, or immediately once this many are pending
+    FLUSH_DELAY_SECONDS = 5.0
+    FLUSH_BATCH_SIZE = 32
+    
+    # Longest flush(wait=True) blocks for the writer thread
+    FLUSH_WAIT_SECONDS = 30.0
+    
+    def __init__(self, cache_dir: Path, max_entries: int = 1000, max_age_days: int = 30,
+                 large_value_threshold: int = 200_000, large_value_eviction_age: int = 1000):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
@@ -53,19 +240,68 @@ class IntelligentCache(LoggerMixin):
         self.max_age_days = max_age_days
         self.similarity_threshold = 0.7  # Minimum similarity for reuse
         
-        # In-memory cache for faster access
-        self._memory_cache: Dict[str, CacheEntry] = {}
-        self._similarity_index: Dict[str, List[str]] = {}  # keyword -> [hashes]
+        # Entries larger than this (bytes) are spared by LRU eviction until
+        # this many cache accesses have passed since their last use
+        self.large_value_threshold = large_value_threshold
+        self.large_value_eviction_age = large_value_eviction_age
         
-        # Cache files
+        # In-memory cache for faster access, kept in least-recently-used order
+        self._memory_cache: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._similarity_index: Dict[str, Set[str]] = {}  # keyword -> {hashes}
+        
+        # Keyword sets as integer bitsets for fast entry-to-entry Jaccard
+        self._keyword_bits: Dict[str, int] = {}  # keyword -> bit position
+        self._keyword_masks: Dict[str, int] = {}  # hash -> keyword bitset
+        self._next_keyword_bit = 0  # positions of dropped keywords are not reused
+        
+        # Running totals over cached entries for statistics
+        self._total_file_size = 0
+        self._total_access_count = 0
+        
+        # Bumped whenever entries or their order change; the hit potential
+        # metric is only recomputed when this moves
+        self._cache_version = 0
+        self._hit_potential: Tuple[int, float] = (-1, 0.0)  # (version, value)
+        
+        # Logical clock of inserts and hits, for large-entry protection
+        self._access_counter = 0
+        self._access_ticks: Dict[str, int] = {}  # hash -> counter at last use
+        
+        # Cache files; the JSON index is only read to migrate older caches
+        self.db_file = self.cache_dir / "cache.db"
         self.index_file = self.cache_dir / "cache_index.json"
         self.metadata_file = self.cache_dir / "cache_metadata.json"
         
+        # Shared connection, only used while holding the database lock
+        self._db = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._db_lock = threading.Lock()
+        
+        # In-memory state is guarded by _lock; when both locks are needed,
+        # _lock is always taken first
+        self._lock = threading.RLock()
+        
+        # Pending disk writes
+        self._dirty_entries: set = set()  # new or replaced entries
+        self._touched_entries: set = set()  # entries with new access metadata
+        self._flush_timer: Optional[threading.Timer] = None
+        
         # Load existing cache
         self._load_cache()
         
+        # Database writes run in order on a background thread, off the
+        # request path
+        self._write_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._writer_loop, name="cache-writer", daemon=True)
+        self._writer.start()
+        
         # Cleanup old entries
         self._cleanup_old_entries()
+        
+        # Persist anything still pending when the interpreter exits
+        atexit.register(self.flush)
     
     def get_cached_analysis(self, transcript: str, file_metadata: Optional[Dict] = None) -> Optional[CacheEntry]:
         """
@@ -80,21 +316,20 @@ class IntelligentCache(LoggerMixin):
         """
         transcript_hash = self._calculate_transcript_hash(transcript)
         
-        # Try exact match first
-        if transcript_hash in self._memory_cache:
-            entry = self._memory_cache[transcript_hash]
-            entry.access_count += 1
-            entry.last_accessed = datetime.now()
-            self.logger.debug(f"🎯 Cache hit (exact): {transcript_hash[:8]}")
-            return entry
-        
-        # Try similarity match
-        similar_entry = self._find_similar_cached_analysis(transcript, file_metadata)
-        if similar_entry:
-            similar_entry.access_count += 1
-            similar_entry.last_accessed = datetime.now()
-            self.logger.debug(f"🎯 Cache hit (similar): {similar_entry.transcript_hash[:8]}")
-            return similar_entry
+        with self._lock:
+            # Try exact match first
+            entry = self._memory_cache.get(transcript_hash)
+            if entry and self._load_payload(entry):
+                self._record_hit(entry)
+                self.logger.debug(f"🎯 Cache hit (exact): {transcript_hash[:8]}")
+                return entry
+            
+            # Try similarity match
+            similar_entry = self._find_similar_cached_analysis(transcript, file_metadata)
+            if similar_entry and self._load_payload(similar_entry):
+                self._record_hit(similar_entry)
+                self.logger.debug(f"🎯 Cache hit (similar): {similar_entry.transcript_hash[:8]}")
+                return similar_entry
         
         self.logger.debug(f"❌ Cache miss: {transcript_hash[:8]}")
         return None
@@ -129,27 +364,146 @@ class IntelligentCache(LoggerMixin):
             file_size=len(transcript.encode('utf-8'))
         )
         
-        # Store in memory cache
-        self._memory_cache[transcript_hash] = entry
-        
-        # Update similarity index
-        for keyword in keywords:
-            if keyword not in self._similarity_index:
-                self._similarity_index[keyword] = []
-            if transcript_hash not in self._similarity_index[keyword]:
-                self._similarity_index[keyword].append(transcript_hash)
-        
-        # Persist to disk
-        self._save_cache_entry(entry)
-        self._save_cache_index()
+        with self._lock:
+            # Re-caching a transcript replaces its previous keywords in the index
+            previous = self._memory_cache.get(transcript_hash)
+            if previous:
+                self._unindex_keywords(transcript_hash, previous.similarity_keywords or [])
+                self._total_file_size -= previous.file_size
+                self._total_access_count -= previous.access_count
+            
+            # Store in memory cache as the most recently used entry
+            self._memory_cache[transcript_hash] = entry
+            self._memory_cache.move_to_end(transcript_hash)
+            self._total_file_size += entry.file_size
+            self._cache_version += 1
+            self._tick(transcript_hash)
+            
+            # Update similarity index
+            self._index_keywords(transcript_hash, keywords)
+            
+            # Persist to disk (write-behind)
+            self._dirty_entries.add(transcript_hash)
+            
+            log_success(self.logger, f"Cached analysis: {transcript_hash[:8]} ({len(keywords)} keywords)")
+            
+            # Cleanup if cache is getting too large
+            if len(self._memory_cache) > self.max_entries:
+                self._cleanup_lru_entries()
+            
+            self._schedule_flush()
         
-        log_success(self.logger, f"Cached analysis: {transcript_hash[:8]} ({len(keywords)} keywords)")
+        return transcript_hash
+    
+    def flush(self, wait: bool = True):
+        """
+        Write pending cache entries and access metadata to disk
         
-        # Cleanup if cache is getting too large
-        if len(self._memory_cache) > self.max_entries:
-            self._cleanup_lru_entries()
+        Args:
+            wait: Block until the writer thread has committed them
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            
+            if self._dirty_entries or self._touched_entries:
+                self._queue_pending_writes()
+        
+        if wait and self._writer.is_alive():
+            done = threading.Event()
+            self._write_queue.put(done)
+            if not done.wait(self.FLUSH_WAIT_SECONDS):
+                log_warning(self.logger, "Timed out waiting for cache writes to complete")
+    
+    def _queue_pending_writes(self):
+        """Hand dirty entries and access updates to the writer thread as one batch"""
+        with self._lock:
+            # Take the pending sets first, so an entry that fails below is
+            # dropped from this batch rather than retried by every flush
+            dirty = set(self._dirty_entries)
+            touched = self._touched_entries - dirty
+            self._dirty_entries.clear()
+            self._touched_entries.clear()
+            
+            rows = []
+            for hash_key in dirty:
+                entry = self._memory_cache.get(hash_key)
+                if entry is None:
+                    continue
+                try:
+                    rows.append(entry.to_row())
+                except Exception as e:
+                    log_warning(self.logger, f"Could not save cache entry {hash_key[:8]}: {e}")
+            
+            access_updates = []
+            for hash_key in touched:
+                entry = self._memory_cache.get(hash_key)
+                if entry is not None:
+                    last_accessed = entry.last_accessed.isoformat() if entry.last_accessed else None
+                    access_updates.append((entry.access_count, last_accessed, hash_key))
+            
+            self._write_queue.put(((_INSERT_ENTRY_SQL, rows), (_UPDATE_ACCESS_SQL, access_updates)))
+    
+    def _writer_loop(self):
+        """Apply queued database writes in order, one transaction per batch"""
+        while True:
+            batch = self._write_queue.get()
+            if isinstance(batch, threading.Event):
+                # Everything queued before this marker has been written
+                batch.set()
+                continue
+            
+            try:
+                with self._db_lock, self._db:
+                    for sql, params in batch:
+                        self._db.executemany(sql, params)
+            except Exception as e:
+                # Any failure only loses this batch; the thread must survive
+                # or every later flush(wait=True) would block on it
+                log_warning(self.logger, f"Could not save cache entries: {e}")
+    
+    def _schedule_flush(self):
+        """Flush now if enough writes are pending, otherwise after a short delay"""
+        if len(self._dirty_entries) >= self.FLUSH_BATCH_SIZE:
+            self.flush(wait=False)
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.FLUSH_DELAY_SECONDS, self.flush, kwargs={'wait': False})
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def _record_hit(self, entry: CacheEntry):
+        """Count an access and move the entry to the most recently used end"""
+        entry.access_count += 1
+        entry.last_accessed = datetime.now()
+        self._total_access_count += 1
+        self._memory_cache.move_to_end(entry.transcript_hash)
+        self._cache_version += 1
+        self._tick(entry.transcript_hash)
+        
+        self._touched_entries.add(entry.transcript_hash)
+        self._schedule_flush()
+    
+    def _load_payload(self, entry: CacheEntry) -> bool:
+        """Read an entry's payload from disk if not loaded yet; drop the entry if unreadable"""
+        if entry.analysis is not None:
+            return True
         
-        return transcript_hash
+        with self._lock:
+            try:
+                with self._db_lock:
+                    row = self._db.execute(_SELECT_PAYLOAD_SQL, (entry.transcript_hash,)).fetchone()
+                if row is None:
+                    raise KeyError("no stored payload")
+                entry_data = _unpack_payload(row[0])
+                entry.analysis = entry_data['analysis']
+                entry.entities = entry_data['entities']
+                entry.metadata = entry_data['metadata']
+                return True
+            except Exception as e:
+                self.logger.debug(f"Could not load cache entry {entry.transcript_hash}: {e}")
+                self._remove_cache_entry(entry.transcript_hash)
+                return False
     
     def get_similar_meetings(self, transcript: str, min_similarity: float = 0.5, 
                            max_results: int = 5) -> List[Dict[str, Any]]:
@@ -167,13 +521,17 @@ class IntelligentCache(LoggerMixin):
         current_keywords = self._extract_keywords_from_text(transcript)
         similar_meetings = []
         
-        for hash_key, entry in self._memory_cache.items():
-            if not entry.similarity_keywords:
-                continue
+        with self._lock:
+            matches = self._score_similar_entries(current_keywords, min_similarity)
             
-            similarity = self._calculate_similarity(current_keywords, entry.similarity_keywords)
-            
-            if similarity >= min_similarity:
+            # Rank first so only the returned entries have their payload read
+            ranked = sorted(matches.items(), key=lambda item: item[1], reverse=True)
+            for hash_key, similarity in ranked:
+                if len(similar_meetings) >= max_results:
+                    break
+                entry = self._memory_cache.get(hash_key)
+                if entry is None or not self._load_payload(entry):
+                    continue
                 similar_meetings.append({
                     'hash': hash_key,
                     'similarity': similarity,
@@ -184,163 +542,74 @@ class IntelligentCache(LoggerMixin):
                     'file_size': entry.file_size
                 })
         
-        # Sort by similarity and return top results
-        similar_meetings.sort(key=lambda x: x['similarity'], reverse=True)
-        return similar_meetings[:max_results]
+        return similar_meetings
     
     def get_cache_statistics(self) -> Dict[str, Any]:
         """Get cache statistics and health information"""
-        now = datetime.now()
-        total_size_mb = sum(entry.file_size for entry in self._memory_cache.values()) / (1024 * 1024)
-        
-        # Age distribution
-        age_buckets = {'<1d': 0, '1-7d': 0, '7-30d': 0, '>30d': 0}
-        access_counts = []
-        
-        for entry in self._memory_cache.values():
-            age_days = (now - entry.created_at).days
-            if age_days < 1:
-                age_buckets['<1d'] += 1
-            elif age_days < 7:
-                age_buckets['1-7d'] += 1
-            elif age_days < 30:
-                age_buckets['7-30d'] += 1
-            else:
-                age_buckets['>30d'] += 1
+        with self._lock:
+            now = datetime.now()
+            total_entries = len(self._memory_cache)
+            
+            # Age distribution, comparing creation times against bucket cutoffs
+            day_cutoff = now - timedelta(days=1)
+            week_cutoff = now - timedelta(days=7)
+            month_cutoff = now - timedelta(days=30)
+            age_buckets = {'<1d': 0, '1-7d': 0, '7-30d': 0, '>30d': 0}
+            
+            for entry in self._memory_cache.values():
+                created_at = entry.created_at
+                if created_at > day_cutoff:
+                    age_buckets['<1d'] += 1
+                elif created_at > week_cutoff:
+                    age_buckets['1-7d'] += 1
+                elif created_at > month_cutoff:
+                    age_buckets['7-30d'] += 1
+                else:
+                    age_buckets['>30d'] += 1
             
-            access_counts.append(entry.access_count)
-        
-        stats = {
-            'total_entries': len(self._memory_cache),
-            'total_size_mb': total_size_mb,
-            'age_distribution': age_buckets,
-            'avg_access_count': sum(access_counts) / len(access_counts) if access_counts else 0,
-            'similarity_keywords': len(self._similarity_index),
-            'cache_hit_potential': self._calculate_hit_potential(),
-            'disk_usage_mb': self._get_disk_usage_mb()
-        }
+            stats = {
+                'total_entries': total_entries,
+                'total_size_mb': self._total_file_size / (1024 * 1024),
+                'age_distribution': age_buckets,
+                'avg_access_count': self._total_access_count / total_entries if total_entries else 0,
+                'similarity_keywords': len(self._similarity_index),
+                'cache_hit_potential': self._calculate_hit_potential(),
+                'disk_usage_mb': self._get_disk_usage_mb()
+            }
         
         return stats
     
     def _calculate_transcript_hash(self, transcript: str) -> str:
         """Calculate a hash for the transcript content"""
-        # Normalize transcript for consistent hashing
-        normalized = self._normalize_transcript(transcript)
-        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return _transcript_hash(transcript)
     
     def _normalize_transcript(self, transcript: str) -> str:
         """Normalize transcript for consistent comparison"""
-        import re
-        
-        # Convert to lowercase
-        text = transcript.lower()
-        
-        # Remove timestamps and speaker indicators
-        text = re.sub(r'\b\d{1,2}:\d{2}(:\d{2})?\b', '', text)
-        text = re.sub(r'\b(speaker|participant)\s*\d+\b', '', text)
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        text = text.strip()
-        
-        return text
+        return _normalize_transcript(transcript)
     
     def _extract_keywords(self, transcript: str, analysis: Dict[str, Any], 
                          entities: Dict[str, List[str]]) -> List[str]:
         """Extract keywords for similarity matching"""
-        keywords = set()
-        
-        # Keywords from transcript
-        keywords.update(self._extract_keywords_from_text(transcript))
-        
-        # Keywords from analysis
+        # Tokens from transcript and analysis
+        tokens = list(self._extract_keywords_from_text(transcript))
         if analysis.get('analysis'):
-            keywords.update(self._extract_keywords_from_text(analysis['analysis']))
+            tokens.extend(self._extract_keywords_from_text(analysis['analysis']))
         
-        # Keywords from entities
+        # Tokens from entities, splitting multi-word entities
         for entity_list in entities.values():
             for entity in entity_list:
-                # Split multi-word entities
-                words = entity.lower().split()
-                keywords.update(words)
+                tokens.extend(entity.lower().split())
         
-        # Filter and clean keywords
-        keywords = self._clean_keywords(keywords)
+        # Count usable keywords in one pass; top keywords by frequency, then alphabetically
+        counts = Counter(token for token in tokens if _is_keyword(token))
+        top_keywords = heapq.nsmallest(_MAX_KEYWORDS, counts, key=lambda keyword: (-counts[keyword], keyword))
         
-        # Return top keywords by relevance
-        return self._rank_keywords(list(keywords), transcript)[:50]  # Top 50 keywords
+        # Interned, so entries sharing a keyword share one string object
+        return [sys.intern(keyword) for keyword in top_keywords]
     
-    def _extract_keywords_from_text(self, text: str) -> List[str]:
+    def _extract_keywords_from_text(self, text: str) -> Tuple[str, ...]:
         """Extract keywords from text using simple NLP techniques"""
-        import re
-        
-        # Convert to lowercase and remove punctuation
-        text = re.sub(r'[^\w\s]', ' ', text.lower())
-        words = text.split()
-        
-        # Common stop words to exclude
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of',
-            'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had',
-            'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
-            'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
-            'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our',
-            'their', 'what', 'which', 'who', 'when', 'where', 'why', 'how', 'all', 'any',
-            'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
-            'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 'can', 'just',
-            'now', 'really', 'also', 'like', 'well', 'get', 'go', 'know', 'think', 'see',
-            'want', 'need', 'going', 'make', 'take', 'come', 'good', 'great', 'right',
-            'okay', 'yeah', 'yes', 'no', 'thanks', 'thank', 'please'
-        }
-        
-        # Filter words
-        keywords = []
-        for word in words:
-            if (len(word) > 2 and 
-                word not in stop_words and 
-                not word.isdigit() and
-                len(word) < 20):  # Exclude very long words
-                keywords.append(word)
-        
-        return keywords
-    
-    def _clean_keywords(self, keywords: set) -> set:
-        """Clean and filter keywords"""
-        cleaned = set()
-        
-        for keyword in keywords:
-            # Skip very short or very long keywords
-            if len(keyword) < 3 or len(keyword) > 20:
-                continue
-            
-            # Skip numbers
-            if keyword.isdigit():
-                continue
-            
-            # Skip common filler words
-            if keyword in ['um', 'uh', 'uhm', 'hmm', 'mmm', 'err']:
-                continue
-            
-            cleaned.add(keyword.lower())
-        
-        return cleaned
-    
-    def _rank_keywords(self, keywords: List[str], text: str) -> List[str]:
-        """Rank keywords by frequency and relevance"""
-        from collections import Counter
-        
-        # Count frequency in text
-        text_lower = text.lower()
-        keyword_counts = Counter()
-        
-        for keyword in keywords:
-            count = text_lower.count(keyword)
-            if count > 0:
-                keyword_counts[keyword] = count
-        
-        # Sort by frequency, then alphabetically
-        ranked = sorted(keyword_counts.items(), key=lambda x: (-x[1], x[0]))
-        return [keyword for keyword, count in ranked]
+        return _text_keywords(text)
     
     def _calculate_similarity(self, keywords1: List[str], keywords2: List[str]) -> float:
         """Calculate similarity between two keyword lists using Jaccard similarity"""
@@ -359,72 +628,97 @@ class IntelligentCache(LoggerMixin):
                                     file_metadata: Optional[Dict] = None) -> Optional[CacheEntry]:
         """Find similar cached analysis using keyword matching"""
         current_keywords = self._extract_keywords_from_text(transcript)
-        best_match = None
-        best_similarity = 0.0
-        
-        for hash_key, entry in self._memory_cache.items():
-            if not entry.similarity_keywords:
-                continue
-            
-            similarity = self._calculate_similarity(current_keywords, entry.similarity_keywords)
-            
-            if similarity > best_similarity and similarity >= self.similarity_threshold:
-                best_similarity = similarity
-                best_match = entry
+        matches = self._score_similar_entries(current_keywords, self.similarity_threshold)
+        if not matches:
+            return None
         
-        return best_match
-    
-    def _save_cache_entry(self, entry: CacheEntry):
-        """Save cache entry to disk"""
-        try:
-            entry_file = self.cache_dir / f"{entry.transcript_hash}.json"
-            with open(entry_file, 'w', encoding='utf-8') as f:
-                json.dump(entry.to_dict(), f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            log_warning(self.logger, f"Could not save cache entry: {e}")
+        best_hash = max(matches, key=matches.get)
+        return self._memory_cache[best_hash]
     
-    def _save_cache_index(self):
-        """Save cache index to disk"""
-        try:
-            index_data = {
-                'memory_cache_keys': list(self._memory_cache.keys()),
-                'similarity_index': self._similarity_index,
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                json.dump(index_data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            log_warning(self.logger, f"Could not save cache index: {e}")
+    def _score_similar_entries(self, keywords: Iterable[str], min_similarity: float) -> Dict[str, float]:
+        """
+        Jaccard similarity of cached entries that reach min_similarity
+        
+        Candidates come from the keyword index, so only entries sharing at
+        least one keyword are considered, and the intersection size is the
+        number of shared index hits. Results are returned in cache order.
+        
+        Scores are exact rather than estimated from SimHash/MinHash
+        signatures: reuse is decided by a hard threshold, and an estimate
+        would let near-threshold entries flip between hit and miss.
+        """
+        query = set(keywords)
+        
+        # Jaccard is at most |entry| / |query|, and entries keep at most
+        # _MAX_KEYWORDS keywords, so long queries cannot reach the threshold
+        if min_similarity > 0 and (not query or _MAX_KEYWORDS / len(query) < min_similarity):
+            return {}
+        
+        shared_counts: Dict[str, int] = {}
+        for keyword in query:
+            for hash_key in self._similarity_index.get(keyword, ()):
+                shared_counts[hash_key] = shared_counts.get(hash_key, 0) + 1
+        
+        scores = {}
+        for hash_key, shared in shared_counts.items():
+            entry = self._memory_cache.get(hash_key)
+            if entry is None or not entry.similarity_keywords:
+                continue
+            similarity = shared / (len(query) + len(entry.similarity_keywords) - shared)
+            if similarity >= min_similarity:
+                scores[hash_key] = similarity
+        
+        if min_similarity <= 0:
+            # Entries sharing no keywords still qualify at a zero threshold
+            scores = {hash_key: scores.get(hash_key, 0.0)
+                      for hash_key, entry in self._memory_cache.items() if entry.similarity_keywords}
+        elif len(scores) > 1:
+            # Keep cache order so ties resolve the same way as a full scan
+            scores = {hash_key: scores[hash_key] for hash_key in self._memory_cache if hash_key in scores}
+        return scores
     
     def _load_cache(self):
         """Load existing cache from disk"""
         try:
-            if not self.index_file.exists():
+            if self.index_file.exists():
+                try:
+                    self._migrate_json_cache()
+                except Exception as e:
+                    # Set an unreadable index aside so it is not retried on
+                    # every start, and load what the database already has
+                    log_warning(self.logger, f"Could not migrate cache index: {e}")
+                    self._set_aside_index()
+            
+            # Load entry summaries; payloads are read on first access
+            with self._db_lock:
+                rows = self._db.execute(_SELECT_SUMMARIES_SQL).fetchall()
+            if not rows:
                 self.logger.info("🗂️ No existing cache found, starting fresh")
                 return
             
-            with open(self.index_file, 'r', encoding='utf-8') as f:
-                index_data = json.load(f)
-            
-            # Load cache entries
             loaded_count = 0
-            for hash_key in index_data.get('memory_cache_keys', []):
-                entry_file = self.cache_dir / f"{hash_key}.json"
-                if entry_file.exists():
-                    try:
-                        with open(entry_file, 'r', encoding='utf-8') as f:
-                            entry_data = json.load(f)
-                        
-                        entry = CacheEntry.from_dict(entry_data)
-                        self._memory_cache[hash_key] = entry
-                        loaded_count += 1
-                    except Exception as e:
-                        self.logger.debug(f"Could not load cache entry {hash_key}: {e}")
+            for row in rows:
+                try:
+                    self._memory_cache[row[0]] = CacheEntry.from_summary_row(row)
+                    loaded_count += 1
+                except Exception as e:
+                    self.logger.debug(f"Could not load cache entry {row[0]}: {e}")
+            
+            # Establish LRU order
+            self._memory_cache = OrderedDict(sorted(
+                self._memory_cache.items(),
+                key=lambda item: item[1].last_accessed or item[1].created_at
+            ))
             
-            # Load similarity index
-            self._similarity_index = index_data.get('similarity_index', {})
+            # Rebuild the similarity index from the loaded entries so it only
+            # references entries that are actually present
+            self._similarity_index = {}
+            for hash_key, entry in self._memory_cache.items():
+                self._index_keywords(hash_key, entry.similarity_keywords or [])
+                self._total_file_size += entry.file_size
+                self._total_access_count += entry.access_count
             
+            self._cache_version += 1
             self.logger.info(f"🗂️ Loaded {loaded_count} cache entries with {len(self._similarity_index)} keywords")
             
         except Exception as e:
@@ -454,60 +748,167 @@ class IntelligentCache(LoggerMixin):
         if len(self._memory_cache) <= self.max_entries:
             return
         
-        # Sort by last accessed time (least recent first)
-        entries_by_access = sorted(
-            self._memory_cache.items(),
-            key=lambda x: x[1].last_accessed or x[1].created_at
-        )
-        
-        # Remove oldest entries
+        # Remove oldest entries from the least recently used end, sparing
+        # recently used large entries
         entries_to_remove = len(self._memory_cache) - self.max_entries + 10  # Remove extra for buffer
-        removed_count = 0
+        to_remove = []
+        shielded = []
+        for hash_key, entry in self._memory_cache.items():
+            if len(to_remove) >= entries_to_remove:
+                break
+            if self._is_shielded(hash_key, entry):
+                shielded.append(hash_key)
+            else:
+                to_remove.append(hash_key)
+        
+        # Fall back to plain LRU order when too few entries are evictable
+        to_remove.extend(shielded[:entries_to_remove - len(to_remove)])
         
-        for hash_key, entry in entries_by_access[:entries_to_remove]:
+        removed_count = 0
+        for hash_key in to_remove:
             self._remove_cache_entry(hash_key)
             removed_count += 1
         
         self.logger.info(f"🧹 Removed {removed_count} LRU cache entries")
     
+    def _tick(self, hash_key: str):
+        """Advance the access clock and stamp the entry with it"""
+        self._access_counter += 1
+        self._access_ticks[hash_key] = self._access_counter
+    
+    def _is_shielded(self, hash_key: str, entry: CacheEntry) -> bool:
+        """Whether a large entry was used too recently to be evicted"""
+        if entry.file_size <= self.large_value_threshold:
+            return False
+        last_tick = self._access_ticks.get(hash_key)
+        return last_tick is not None and self._access_counter - last_tick < self.large_value_eviction_age
+    
     def _remove_cache_entry(self, hash_key: str):
         """Remove a cache entry from memory and disk"""
-        # Remove from memory cache
-        if hash_key in self._memory_cache:
-            del self._memory_cache[hash_key]
-        
-        # Remove from similarity index
-        for keyword, hash_list in self._similarity_index.items():
-            if hash_key in hash_list:
-                hash_list.remove(hash_key)
+        with self._lock:
+            # Remove from memory cache
+            entry = self._memory_cache.pop(hash_key, None)
+            self._cache_version += 1
+            self._dirty_entries.discard(hash_key)
+            self._touched_entries.discard(hash_key)
+            self._access_ticks.pop(hash_key, None)
+            
+            # Remove from similarity index, touching only the entry's keywords
+            if entry is not None:
+                self._unindex_keywords(hash_key, entry.similarity_keywords or [])
+                self._total_file_size -= entry.file_size
+                self._total_access_count -= entry.access_count
+            self._keyword_masks.pop(hash_key, None)
+            
+            # Remove from disk, ordered after any queued write of the entry
+            self._write_queue.put(((_DELETE_ENTRY_SQL, [(hash_key,)]),))
+    
+    def _migrate_json_cache(self):
+        """Move a cache stored as per-entry JSON files into the database"""
+        index_data = json.loads(self.index_file.read_bytes())
+        summaries = index_data.get('entries', {})
+        
+        rows = []
+        for hash_key in index_data.get('memory_cache_keys', []):
+            entry_file = self.cache_dir / f"{hash_key}.json"
+            if not entry_file.exists():
+                continue
+            try:
+                entry_data = json.loads(entry_file.read_bytes())
+                # Index summaries carry newer access metadata than entry files
+                summary = summaries.get(hash_key, {})
+                for field in ('access_count', 'last_accessed'):
+                    if field in summary:
+                        entry_data[field] = summary[field]
+                rows.append(CacheEntry.from_dict(entry_data).to_row())
+            except Exception as e:
+                self.logger.debug(f"Could not migrate cache entry {hash_key}: {e}")
         
-        # Remove empty keyword entries
-        self._similarity_index = {k: v for k, v in self._similarity_index.items() if v}
+        with self._db_lock, self._db:
+            self._db.executemany(_INSERT_ENTRY_SQL, rows)
         
-        # Remove from disk
-        entry_file = self.cache_dir / f"{hash_key}.json"
-        if entry_file.exists():
+        # Remove every old entry file, including ones the index no longer
+        # listed, so none are left behind as orphans
+        entry_files = [path for path in self.cache_dir.glob('*.json') if _ENTRY_FILE_RE.fullmatch(path.name)]
+        for path in entry_files + [self.index_file]:
             try:
-                entry_file.unlink()
-            except Exception as e:
-                self.logger.debug(f"Could not remove cache file {hash_key}: {e}")
+                path.unlink()
+            except OSError as e:
+                self.logger.debug(f"Could not remove migrated cache file {path.name}: {e}")
+        
+        self.logger.info(f"🗂️ Migrated {len(rows)} cache entries to {self.db_file.name}")
+    
+    def _set_aside_index(self):
+        """Rename an index that could not be migrated to cache_index.json.bad"""
+        try:
+            self.index_file.replace(self.index_file.with_name(self.index_file.name + ".bad"))
+        except OSError as e:
+            self.logger.debug(f"Could not set aside cache index {self.index_file.name}: {e}")
+    
+    def _index_keywords(self, hash_key: str, keywords: List[str]):
+        """Add a hash to the similarity index and record its keyword bitset"""
+        mask = 0
+        for keyword in keywords:
+            self._similarity_index.setdefault(keyword, set()).add(hash_key)
+            
+            bit = self._keyword_bits.get(keyword)
+            if bit is None:
+                bit = self._keyword_bits[keyword] = self._next_keyword_bit
+                self._next_keyword_bit += 1
+            mask |= 1 << bit
+        self._keyword_masks[hash_key] = mask
+    
+    def _unindex_keywords(self, hash_key: str, keywords: List[str]):
+        """Remove a hash from the similarity index sets of the given keywords"""
+        for keyword in keywords:
+            hashes = self._similarity_index.get(keyword)
+            if hashes:
+                hashes.discard(hash_key)
+                if not hashes:
+                    # No entry uses the keyword any more, so drop its bit too
+                    del self._similarity_index[keyword]
+                    self._keyword_bits.pop(keyword, None)
+        
+        # Dropped bits leave gaps that widen every new mask; renumber the
+        # live vocabulary once the gaps outnumber it
+        if self._next_keyword_bit > max(2 * len(self._keyword_bits), _MIN_KEYWORD_BITS):
+            self._compact_keyword_bits()
+    
+    def _compact_keyword_bits(self):
+        """Renumber live keywords to dense bit positions and rebuild the masks"""
+        self._keyword_bits = {keyword: bit for bit, keyword in enumerate(self._similarity_index)}
+        self._next_keyword_bit = len(self._keyword_bits)
+        
+        masks = dict.fromkeys(self._keyword_masks, 0)
+        for keyword, hashes in self._similarity_index.items():
+            flag = 1 << self._keyword_bits[keyword]
+            for hash_key in hashes:
+                masks[hash_key] = masks.get(hash_key, 0) | flag
+        self._keyword_masks = masks
     
     def _calculate_hit_potential(self) -> float:
         """Calculate potential for cache hits based on similarity"""
+        version, value = self._hit_potential
+        if version != self._cache_version:
+            value = self._compute_hit_potential()
+            self._hit_potential = (self._cache_version, value)
+        return value
+    
+    def _compute_hit_potential(self) -> float:
+        """Share of neighbouring entry pairs (in cache order) with similar keywords"""
         if len(self._memory_cache) < 2:
             return 0.0
         
-        entries = list(self._memory_cache.values())
+        masks = [self._keyword_masks.get(hash_key, 0) for hash_key in self._memory_cache]
         similar_pairs = 0
         total_pairs = 0
         
-        for i in range(len(entries)):
-            for j in range(i + 1, min(i + 10, len(entries))):  # Check up to 10 pairs per entry
-                if entries[i].similarity_keywords and entries[j].similarity_keywords:
-                    similarity = self._calculate_similarity(
-                        entries[i].similarity_keywords,
-                        entries[j].similarity_keywords
-                    )
+        for i in range(len(masks)):
+            for j in range(i + 1, min(i + 10, len(masks))):  # Check up to 10 pairs per entry
+                if masks[i] and masks[j]:
+                    # Jaccard similarity of the two keyword bitsets
+                    union = (masks[i] | masks[j]).bit_count()
+                    similarity = (masks[i] & masks[j]).bit_count() / union
                     if similarity > 0.3:  # Lower threshold for potential
                         similar_pairs += 1
                     total_pairs += 1
@@ -515,12 +916,12 @@ class IntelligentCache(LoggerMixin):
         return similar_pairs / total_pairs if total_pairs > 0 else 0.0
     
     def _get_disk_usage_mb(self) -> float:
-        """Calculate disk usage of cache directory"""
+        """Calculate disk usage of the cache database"""
         try:
-            total_size = 0
-            for file_path in self.cache_dir.glob("*.json"):
-                total_size += file_path.stat().st_size
-            return total_size / (1024 * 1024)
+            with self._db_lock:
+                page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+                page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+            return page_count * page_size / (1024 * 1024)
         except Exception:
             return 0.0
 
@@ -3,12 +3,27 @@ Enhanced Progress Tracking for Meeting Processor
 Provides detailed progress feedback with percentages, ETAs, and stage tracking
 """
 
+import atexit
+import logging
+import threading
 import time
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from collections import deque
+from itertools import accumulate
+from types import MappingProxyType
+from typing import List, Optional, Dict, Any, Tuple, Mapping
 from dataclasses import dataclass, field
 from utils.logger import LoggerMixin, log_success
 
+# Buffered DEBUG progress lines are written out once this many have accumulated
+_LOG_FLUSH_SIZE = 16
+
+# Number of recent (time, progress) samples the ETA is projected from
+_ETA_WINDOW = 20
+
+# Every possible progress bar, indexed by the number of filled cells
+_BAR_LENGTH = 20
+_BARS = ['█' * filled + '░' * (_BAR_LENGTH - filled) for filled in range(_BAR_LENGTH + 1)]
+
 
 @dataclass
 class ProcessingStage:
@@ -18,6 +33,10 @@ class ProcessingStage:
     emoji: str
     estimated_duration: float = 0.0  # seconds
     weight: float = 1.0  # relative weight for progress calculation
+    label: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.label = f"{self.emoji} {self.display_name}"
 
 
 @dataclass
@@ -27,13 +46,29 @@ class ProcessingProgress:
     stages: List[ProcessingStage] = field(default_factory=list)
     current_stage_index: int = 0
     stage_progress: float = 0.0  # 0.0 to 1.0
-    start_time: datetime = field(default_factory=datetime.now)
-    stage_start_time: datetime = field(default_factory=datetime.now)
+    start_time: float = field(default_factory=time.monotonic)  # monotonic seconds
+    stage_start_time: float = field(default_factory=time.monotonic)
     file_size_mb: float = 0.0
     
     def __post_init__(self):
         if not self.stages:
             self.stages = self._default_stages()
+        
+        # Stages are fixed per session, so weight sums are computed once;
+        # _cum_weight[i] is the total weight of the stages before stage i
+        self._total_weight = sum(stage.weight for stage in self.stages)
+        self._cum_weight = list(accumulate((stage.weight for stage in self.stages), initial=0))
+        
+        # Stage name -> index of its first occurrence
+        self._stage_index: Dict[str, int] = {}
+        for index, stage in enumerate(self.stages):
+            self._stage_index.setdefault(stage.name, index)
+        
+        # Recent (monotonic time, overall progress) samples for the ETA
+        self._eta_window: deque = deque([(self.start_time, 0.0)], maxlen=_ETA_WINDOW)
+        
+        # Highest 25% milestone already logged at INFO level
+        self._last_logged_milestone = -1
     
     def _default_stages(self) -> List[ProcessingStage]:
         """Default processing stages for meeting files"""
@@ -59,11 +94,10 @@ class ProcessingProgress:
         if not self.stages:
             return 0.0
         
-        total_weight = sum(stage.weight for stage in self.stages)
-        completed_weight = sum(stage.weight for stage in self.stages[:self.current_stage_index])
+        completed_weight = self._cum_weight[min(self.current_stage_index, len(self.stages))]
         current_stage_weight = self.current_stage.weight * self.stage_progress
         
-        return ((completed_weight + current_stage_weight) / total_weight) * 100
+        return ((completed_weight + current_stage_weight) / self._total_weight) * 100
     
     @property
     def estimated_total_duration(self) -> float:
@@ -76,21 +110,47 @@ class ProcessingProgress:
     @property
     def eta_seconds(self) -> Optional[float]:
         """Calculate estimated time to completion"""
+        return self._eta_at(time.monotonic(), self.overall_progress)
+    
+    @property
+    def eta_formatted(self) -> str:
+        """Get formatted ETA string"""
+        return self._format_eta(self.eta_seconds)
+    
+    def _compute_snapshot(self, now: float) -> Tuple[float, Optional[float], str]:
+        """Overall progress, ETA seconds and formatted ETA, all at one clock reading"""
         progress = self.overall_progress
+        eta = self._eta_at(now, progress)
+        return progress, eta, self._format_eta(eta)
+    
+    def record_sample(self, now: float) -> None:
+        """Add the current overall progress to the ETA window"""
+        self._eta_window.append((now, self.overall_progress))
+    
+    def _eta_at(self, now: float, progress: float) -> Optional[float]:
+        """Estimated seconds to completion at the given monotonic time"""
         if progress <= 0:
             return None
         
-        elapsed = (datetime.now() - self.start_time).total_seconds()
         if progress >= 100:
             return 0
         
-        total_estimated = elapsed * (100 / progress)
-        return max(0, total_estimated - elapsed)
+        # Project from the progress rate across the recent window, so early
+        # noisy updates stop influencing the ETA once they roll out
+        if len(self._eta_window) < 2:
+            return None
+        
+        first_time, first_progress = self._eta_window[0]
+        last_time, last_progress = self._eta_window[-1]
+        if last_time <= first_time or last_progress <= first_progress:
+            return None
+        
+        rate = (last_progress - first_progress) / (last_time - first_time)
+        return max(0, (100 - progress) / rate - (now - last_time))
     
-    @property
-    def eta_formatted(self) -> str:
-        """Get formatted ETA string"""
-        eta = self.eta_seconds
+    @staticmethod
+    def _format_eta(eta: Optional[float]) -> str:
+        """Format an ETA in seconds for display"""
         if eta is None:
             return "calculating..."
         elif eta < 60:
@@ -106,8 +166,21 @@ class ProgressTracker(LoggerMixin):
     
     def __init__(self):
         self.active_sessions: Dict[str, ProcessingProgress] = {}
-        self.last_update_time: Dict[str, datetime] = {}
+        self.last_update_time: Dict[str, float] = {}  # monotonic seconds
         self.update_interval = 10.0  # seconds between progress updates
+        
+        # DEBUG progress lines are buffered and written in batches; INFO lines
+        # are written straight away, after any DEBUG lines queued before them
+        self._log_buffer: deque = deque()
+        self._log_lock = threading.Lock()  # serializes flushes from worker threads
+        self._last_flush_time = time.monotonic()
+        atexit.register(self._flush_logs)
+        
+        # Bumped after every session change; get_overall_stats() reuses its
+        # last result while the version is unchanged
+        self._version = 0
+        self._stats_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+        self._stats_lock = threading.Lock()  # guards _version and _stats_cache
     
     def start_processing(self, filename: str, file_size_mb: float = 0.0) -> ProcessingProgress:
         """Start tracking progress for a file"""
@@ -117,10 +190,13 @@ class ProgressTracker(LoggerMixin):
         )
         
         self.active_sessions[filename] = progress
-        self.last_update_time[filename] = datetime.now()
+        self._bump_version()
+        now = time.monotonic()
+        self.last_update_time[filename] = now
         
+        self._flush_logs(now)
         self.logger.info(f"🎬 Starting processing: {filename} ({file_size_mb:.1f}MB)")
-        self._log_progress(progress, force=True)
+        self._log_progress(progress, force=True, now=now)
         
         return progress
     
@@ -131,29 +207,37 @@ class ProgressTracker(LoggerMixin):
             return
         
         session = self.active_sessions[filename]
+        now = time.monotonic()
         
-        # Find stage index
-        stage_index = -1
-        for i, stage in enumerate(session.stages):
-            if stage.name == stage_name:
-                stage_index = i
-                break
+        # Within the logging interval, progress on the current stage only
+        # needs recording; nothing would be logged
+        last_update = self.last_update_time.get(filename, session.start_time)
+        if now - last_update < self.update_interval and stage_name == session.current_stage.name:
+            session.stage_progress = max(0.0, min(1.0, progress))
+            session.record_sample(now)
+            self._bump_version()
+            return
         
+        # Find stage index
+        stage_index = session._stage_index.get(stage_name, -1)
         if stage_index == -1:
+            self._flush_logs(now)
             self.logger.warning(f"Unknown stage: {stage_name}")
             return
         
         # Update stage if we've progressed
         if stage_index > session.current_stage_index:
             session.current_stage_index = stage_index
-            session.stage_start_time = datetime.now()
+            session.stage_start_time = now
             session.stage_progress = 0.0
         
         # Update progress within current stage
         session.stage_progress = max(0.0, min(1.0, progress))
+        session.record_sample(now)
+        self._bump_version()
         
         # Log progress if enough time has passed or significant change
-        self._log_progress_if_needed(session, details)
+        self._log_progress_if_needed(session, now, details)
     
     def complete_stage(self, filename: str, stage_name: str, details: str = "") -> None:
         """Mark a stage as complete"""
@@ -162,10 +246,12 @@ class ProgressTracker(LoggerMixin):
         if filename in self.active_sessions:
             session = self.active_sessions[filename]
             stage = session.current_stage
-            stage_duration = (datetime.now() - session.stage_start_time).total_seconds()
+            now = time.monotonic()
+            stage_duration = now - session.stage_start_time
             
+            self._flush_logs(now)
             self.logger.info(
-                f"✅ {stage.emoji} {stage.display_name} complete: {filename} "
+                f"✅ {stage.label} complete: {filename} "
                 f"({stage_duration:.1f}s) {details}"
             )
     
@@ -175,8 +261,10 @@ class ProgressTracker(LoggerMixin):
             return
         
         session = self.active_sessions[filename]
-        total_duration = (datetime.now() - session.start_time).total_seconds()
+        now = time.monotonic()
+        total_duration = now - session.start_time
         
+        self._flush_logs(now)
         if success:
             log_success(
                 self.logger, 
@@ -188,32 +276,42 @@ class ProgressTracker(LoggerMixin):
         
         # Clean up
         del self.active_sessions[filename]
+        self._bump_version()
         if filename in self.last_update_time:
             del self.last_update_time[filename]
     
-    def _log_progress_if_needed(self, session: ProcessingProgress, details: str = "") -> None:
+    def _log_progress_if_needed(self, session: ProcessingProgress, now: float, details: str = "") -> None:
         """Log progress if enough time has passed"""
-        now = datetime.now()
         last_update = self.last_update_time.get(session.filename, session.start_time)
         
-        if (now - last_update).total_seconds() >= self.update_interval:
-            self._log_progress(session, details)
+        if now - last_update >= self.update_interval:
+            self._log_progress(session, details, now=now)
             self.last_update_time[session.filename] = now
     
-    def _log_progress(self, session: ProcessingProgress, details: str = "", force: bool = False) -> None:
+    def _log_progress(self, session: ProcessingProgress, details: str = "", force: bool = False,
+                      now: Optional[float] = None) -> None:
         """Log detailed progress information"""
+        if now is None:
+            now = time.monotonic()
         stage = session.current_stage
-        progress_pct = session.overall_progress
-        eta = session.eta_formatted
+        progress_pct, _, eta = session._compute_snapshot(now)
+        
+        # Log at INFO when a new 25% milestone is reached, otherwise at DEBUG
+        milestone = int(progress_pct // 25) * 25
+        if force or milestone > session._last_logged_milestone:
+            session._last_logged_milestone = milestone
+            level = logging.INFO
+        elif self.logger.isEnabledFor(logging.DEBUG):
+            level = logging.DEBUG
+        else:
+            return
         
         # Create progress bar
-        bar_length = 20
-        filled_length = int(bar_length * progress_pct / 100)
-        bar = '█' * filled_length + '░' * (bar_length - filled_length)
+        bar = _BARS[int(_BAR_LENGTH * progress_pct / 100)]
         
         # Build status message
         status_parts = [
-            f"{stage.emoji} {stage.display_name}",
+            stage.label,
             f"[{bar}] {progress_pct:.1f}%",
             f"ETA: {eta}"
         ]
@@ -223,18 +321,54 @@ class ProgressTracker(LoggerMixin):
         
         status = " • ".join(status_parts)
         
-        # Log with appropriate level
-        if force or progress_pct % 25 == 0:  # Log at major milestones
-            self.logger.info(f"🔄 {session.filename}: {status}")
-        else:
-            self.logger.debug(f"Progress {session.filename}: {status}")
+        if level == logging.INFO:
+            with self._log_lock:
+                self._drain_log_buffer(now)
+                self.logger.info(f"🔄 {session.filename}: {status}")
+            return
+        
+        self._log_buffer.append(f"Progress {session.filename}: {status}")
+        
+        if len(self._log_buffer) >= _LOG_FLUSH_SIZE or now - self._last_flush_time >= self.update_interval:
+            self._flush_logs(now)
     
-    def get_active_sessions(self) -> Dict[str, ProcessingProgress]:
-        """Get all active processing sessions"""
-        return self.active_sessions.copy()
+    def _flush_logs(self, now: Optional[float] = None) -> None:
+        """Write buffered DEBUG progress lines"""
+        with self._log_lock:
+            self._drain_log_buffer(now)
+    
+    def _drain_log_buffer(self, now: Optional[float] = None) -> None:
+        """Write buffered lines, one record each; caller holds _log_lock"""
+        self._last_flush_time = time.monotonic() if now is None else now
+        while self._log_buffer:
+            self.logger.debug(self._log_buffer.popleft())
+    
+    def get_active_sessions(self) -> Mapping[str, ProcessingProgress]:
+        """Get a read-only live view of all active processing sessions"""
+        return MappingProxyType(self.active_sessions)
+    
+    def _bump_version(self) -> None:
+        """Invalidate cached stats; call after a session has been changed"""
+        with self._stats_lock:
+            self._version += 1
     
     def get_overall_stats(self) -> Dict[str, Any]:
-        """Get overall processing statistics"""
+        """Get overall processing statistics (as of the last session change)"""
+        with self._stats_lock:
+            version = self._version
+            if self._stats_cache and self._stats_cache[0] == version:
+                return self._stats_cache[1]
+        
+        # Computed outside the lock: changes made meanwhile bump the version
+        # afterwards, so a result cached under the version read above is
+        # never reused past them
+        stats = self._compute_overall_stats()
+        with self._stats_lock:
+            self._stats_cache = (version, stats)
+        return stats
+    
+    def _compute_overall_stats(self) -> Dict[str, Any]:
+        """Build overall processing statistics from the active sessions"""
         if not self.active_sessions:
             return {"active_files": 0, "total_progress": 0}
         
@@ -4,29 +4,81 @@ Handles file cleanup, memory management, and connection pooling
 """
 
 import gc
+import heapq
+import logging
 import os
+import shutil
 import tempfile
 import threading
+import time
 import weakref
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Set, ContextManager, Any, Dict
+from typing import Optional, Set, ContextManager, Any, Dict, List, Tuple, Callable
 from contextlib import contextmanager
 from utils.logger import LoggerMixin, log_warning, log_error, log_success
 
+try:
+    import psutil
+    _HAS_PSUTIL = True
+except ImportError:  # psutil is optional; monitoring degrades gracefully
+    psutil = None
+    _HAS_PSUTIL = False
+
+# Byte-to-unit multipliers
+_INV_MB = 1.0 / (1024 * 1024)
+_INV_GB = 1.0 / (1024 * 1024 * 1024)
+
+# Minimum seconds between detailed memory reports (each one walks every process)
+_MEMORY_DETAILS_INTERVAL = 60.0
+
+# lru_cache-wrapped functions cleared by emergency cleanup
+_LRU_CACHES: List[Callable] = []
+
+
+def register_lru_cache(fn: Callable) -> Callable:
+    """Register an lru_cache-wrapped function to be cleared under memory pressure"""
+    _LRU_CACHES.append(fn)
+    return fn
+
 
 class ResourceManager(LoggerMixin):
     """Manages temporary files and memory cleanup"""
     
     def __init__(self):
-        self._temp_files: Set[Path] = set()
+        # Temp files are tracked in one set per thread, so creating and
+        # removing them never takes the shared lock; each set is registered
+        # in _file_sets (under the lock) the first time its thread uses it
+        self._tls = threading.local()
+        self._file_sets: List[Tuple[weakref.ref, Set[Path]]] = []
         self._temp_dirs: Set[Path] = set()
         self._lock = threading.RLock()
         self._cleanup_on_exit = True
+        
+        # Deferred temp file deletions as (path, owning thread's set)
+        self._pending_delete: deque = deque()
+        
+        # One handle for this process, reused by every memory query
+        self._proc = psutil.Process() if _HAS_PSUTIL else None
+    
+    def _thread_files(self) -> Set[Path]:
+        """Get the calling thread's temp file set, registering it on first use"""
+        files = getattr(self._tls, 'files', None)
+        if files is None:
+            files = self._tls.files = set()
+            with self._lock:
+                self._file_sets.append((weakref.ref(threading.current_thread()), files))
+        return files
+    
+    def _tracked_temp_files(self) -> Set[Path]:
+        """Snapshot of the temp files tracked across all threads"""
+        with self._lock:
+            return set().union(*(files for _, files in self._file_sets))
     
     @contextmanager
     def temporary_file(self, suffix: str = '', prefix: str = 'mp_', 
-                      delete_on_exit: bool = True) -> ContextManager[Path]:
+                      delete_on_exit: bool = True, defer: bool = False) -> ContextManager[Path]:
         """
         Context manager for temporary files that are automatically cleaned up
         
@@ -34,6 +86,7 @@ class ResourceManager(LoggerMixin):
             suffix: File suffix (e.g., '.mp3', '.txt')
             prefix: File prefix
             delete_on_exit: Whether to delete file when context exits
+            defer: Queue the deletion for the next flush_deletes() instead
         
         Yields:
             Path: Path to temporary file
@@ -45,8 +98,7 @@ class ResourceManager(LoggerMixin):
             os.close(fd)  # Close file descriptor immediately
             temp_file = Path(temp_path)
             
-            with self._lock:
-                self._temp_files.add(temp_file)
+            self._thread_files().add(temp_file)
             
             self.logger.info(f"📁 Created temporary file: {temp_file.name}")
             yield temp_file
@@ -56,7 +108,10 @@ class ResourceManager(LoggerMixin):
             raise
         finally:
             if temp_file and delete_on_exit:
-                self._cleanup_temp_file(temp_file)
+                if defer:
+                    self._pending_delete.append((temp_file, self._thread_files()))
+                else:
+                    self._cleanup_temp_file(temp_file)
     
     @contextmanager
     def temporary_directory(self, prefix: str = 'mp_dir_', 
@@ -88,42 +143,72 @@ class ResourceManager(LoggerMixin):
             if temp_dir and delete_on_exit:
                 self._cleanup_temp_dir(temp_dir)
     
-    def _cleanup_temp_file(self, temp_file: Path) -> None:
-        """Safely cleanup a temporary file"""
+    def _cleanup_temp_file(self, temp_file: Path, owner: Optional[Set[Path]] = None) -> None:
+        """Safely cleanup a temporary file tracked in owner (default: this thread's set)"""
         try:
             if temp_file.exists():
                 temp_file.unlink()
                 self.logger.info(f"🗑️ Cleaned up temporary file: {temp_file.name}")
             
-            with self._lock:
-                self._temp_files.discard(temp_file)
+            (self._thread_files() if owner is None else owner).discard(temp_file)
                 
         except Exception as e:
             log_warning(self.logger, f"Failed to cleanup temporary file {temp_file}: {e}")
     
+    def flush_deletes(self) -> None:
+        """Delete all temporary files queued by deferred cleanup"""
+        deleted = 0
+        while True:
+            try:
+                temp_file, owner = self._pending_delete.popleft()
+            except IndexError:
+                break
+            
+            try:
+                os.unlink(temp_file)
+                deleted += 1
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                log_warning(self.logger, f"Failed to cleanup temporary file {temp_file}: {e}")
+                continue
+            owner.discard(temp_file)
+        
+        if deleted:
+            self.logger.info(f"🗑️ Cleaned up {deleted} temp files")
+    
     def _cleanup_temp_dir(self, temp_dir: Path) -> None:
         """Safely cleanup a temporary directory"""
-        try:
-            if temp_dir.exists():
-                import shutil
-                shutil.rmtree(temp_dir)
-                self.logger.info(f"🗑️ Cleaned up temporary directory: {temp_dir.name}")
-            
-            with self._lock:
-                self._temp_dirs.discard(temp_dir)
-                
-        except Exception as e:
-            log_warning(self.logger, f"Failed to cleanup temporary directory {temp_dir}: {e}")
+        # Errors inside the tree are ignored; a directory that survives is
+        # reported below and stays tracked for the next cleanup_all()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        
+        if os.path.lexists(temp_dir):
+            log_warning(self.logger, f"Failed to cleanup temporary directory {temp_dir}")
+            return
+        
+        with self._lock:
+            self._temp_dirs.discard(temp_dir)
+        
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"🗑️ Cleaned up temporary directory: {temp_dir.name}")
     
     def cleanup_all(self) -> None:
         """Clean up all tracked temporary files and directories"""
         self.logger.info("🧹 Starting resource cleanup...")
         
+        self.flush_deletes()
+        
         with self._lock:
-            # Cleanup temporary files
-            temp_files = self._temp_files.copy()
-            for temp_file in temp_files:
-                self._cleanup_temp_file(temp_file)
+            # Cleanup temporary files from every thread's set, then forget
+            # the sets of threads that have exited
+            for _, files in self._file_sets:
+                for temp_file in files.copy():
+                    self._cleanup_temp_file(temp_file, files)
+            self._file_sets = [
+                (thread_ref, files) for thread_ref, files in self._file_sets
+                if files or thread_ref() is not None
+            ]
             
             # Cleanup temporary directories
             temp_dirs = self._temp_dirs.copy()
@@ -136,24 +221,21 @@ class ResourceManager(LoggerMixin):
     
     def get_memory_usage(self) -> dict:
         """Get current memory usage statistics"""
-        try:
-            import psutil
-            process = psutil.Process()
-            memory_info = process.memory_info()
-            
+        if not _HAS_PSUTIL:
             return {
-                'rss_mb': memory_info.rss / 1024 / 1024,
-                'vms_mb': memory_info.vms / 1024 / 1024,
-                'percent': process.memory_percent(),
-                'temp_files': len(self._temp_files),
-                'temp_dirs': len(self._temp_dirs)
-            }
-        except ImportError:
-            # psutil not available
-            return {
-                'temp_files': len(self._temp_files),
+                'temp_files': len(self._tracked_temp_files()),
                 'temp_dirs': len(self._temp_dirs)
             }
+        
+        memory_info = self._proc.memory_info()
+        
+        return {
+            'rss_mb': memory_info.rss * _INV_MB,
+            'vms_mb': memory_info.vms * _INV_MB,
+            'percent': self._proc.memory_percent(),
+            'temp_files': len(self._tracked_temp_files()),
+            'temp_dirs': len(self._temp_dirs)
+        }
 
 
 class ConnectionPool:
@@ -161,8 +243,10 @@ class ConnectionPool:
     
     def __init__(self, max_size: int = 10):
         self.max_size = max_size
-        self._pool = []
-        self._in_use = set()
+        self._pool: deque = deque()
+        # id(conn) -> weak reference to conn (or conn itself when it cannot be
+        # weakly referenced); dead references remove their own entry
+        self._in_use: Dict[int, Any] = {}
         self._lock = threading.RLock()
         self._factory = None
     
@@ -187,24 +271,29 @@ class ConnectionPool:
             # Try to get from pool
             if self._pool:
                 conn = self._pool.pop()
-                self._in_use.add(id(conn))
+                self._track(conn)
                 return conn
             
             # Create new connection if factory is available
             if self._factory:
                 conn = self._factory()
-                self._in_use.add(id(conn))
+                self._track(conn)
                 return conn
             
             raise RuntimeError("No factory function set for connection pool")
     
+    def _track(self, conn):
+        """Record a connection as checked out"""
+        conn_id = id(conn)
+        try:
+            self._in_use[conn_id] = weakref.ref(conn, lambda _: self._in_use.pop(conn_id, None))
+        except TypeError:
+            self._in_use[conn_id] = conn
+    
     def _release(self, conn):
         """Release a connection back to the pool"""
         with self._lock:
-            conn_id = id(conn)
-            if conn_id in self._in_use:
-                self._in_use.remove(conn_id)
-                
+            if self._in_use.pop(id(conn), None) is not None:
                 # Add back to pool if not full
                 if len(self._pool) < self.max_size:
                     self._pool.append(conn)
@@ -231,6 +320,14 @@ class MemoryMonitor(LoggerMixin):
         self._last_check_size = 0
         self._alert_threshold = 0.85  # Alert at 85% of system memory
         self._critical_threshold = 0.95  # Critical at 95% of system memory
+        
+        # Last get_resource_status() result as (monotonic time, status)
+        self._status_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._status_ttl = 1.0  # seconds
+        
+        # One handle for this process, reused by every memory query
+        self._proc = psutil.Process() if _HAS_PSUTIL else None
+        self._last_details_time: Optional[float] = None  # monotonic seconds
     
     def check_memory_usage(self) -> bool:
         """
@@ -239,45 +336,41 @@ class MemoryMonitor(LoggerMixin):
         Returns:
             bool: True if cleanup was triggered
         """
-        try:
-            import psutil
-            
-            # Get system memory info
-            system_memory = psutil.virtual_memory()
-            system_usage_percent = system_memory.percent / 100
-            
-            # Get process memory info
-            process = psutil.Process()
-            process_memory_mb = process.memory_info().rss / 1024 / 1024
-            
-            # Check critical system memory usage
-            if system_usage_percent > self._critical_threshold:
-                log_warning(self.logger, f"🚨 CRITICAL: System memory usage: {system_usage_percent*100:.1f}%")
-                self._trigger_emergency_cleanup()
-                return True
-            
-            # Check alert threshold
-            elif system_usage_percent > self._alert_threshold:
-                log_warning(self.logger, f"⚠️ High system memory usage: {system_usage_percent*100:.1f}%")
-                self._log_memory_details()
-            
-            # Check process memory threshold
-            if process_memory_mb > self.threshold_mb:
-                log_warning(self.logger, f"🚨 Process memory usage high: {process_memory_mb:.1f}MB (threshold: {self.threshold_mb}MB)")
-                self._trigger_cleanup()
-                return True
-            
-            # Log significant memory increases
-            if process_memory_mb > self._last_check_size + 100:  # 100MB increase
-                self.logger.info(f"📊 Memory usage: {process_memory_mb:.1f}MB (system: {system_usage_percent*100:.1f}%)")
-            
-            self._last_check_size = process_memory_mb
-            return False
-            
-        except ImportError:
+        if not _HAS_PSUTIL:
             # psutil not available, skip monitoring
             self.logger.warning("⚠️ psutil not available - memory monitoring disabled")
             return False
+        
+        # Get system memory info
+        system_memory = psutil.virtual_memory()
+        system_usage_percent = system_memory.percent / 100
+        
+        # Get process memory info
+        process_memory_mb = self._proc.memory_info().rss * _INV_MB
+        
+        # Check critical system memory usage
+        if system_usage_percent > self._critical_threshold:
+            log_warning(self.logger, f"🚨 CRITICAL: System memory usage: {system_usage_percent*100:.1f}%")
+            self._trigger_emergency_cleanup()
+            return True
+        
+        # Check alert threshold
+        elif system_usage_percent > self._alert_threshold:
+            log_warning(self.logger, f"⚠️ High system memory usage: {system_usage_percent*100:.1f}%")
+            self._log_memory_details()
+        
+        # Check process memory threshold
+        if process_memory_mb > self.threshold_mb:
+            log_warning(self.logger, f"🚨 Process memory usage high: {process_memory_mb:.1f}MB (threshold: {self.threshold_mb}MB)")
+            self._trigger_cleanup()
+            return True
+        
+        # Log significant memory increases
+        if process_memory_mb > self._last_check_size + 100:  # 100MB increase
+            self.logger.info(f"📊 Memory usage: {process_memory_mb:.1f}MB (system: {system_usage_percent*100:.1f}%)")
+        
+        self._last_check_size = process_memory_mb
+        return False
     
     def check_disk_space(self, path: str = "/", threshold_percent: float = 0.9) -> bool:
         """
@@ -290,14 +383,16 @@ class MemoryMonitor(LoggerMixin):
         Returns:
             bool: True if disk space is sufficient
         """
+        if not _HAS_PSUTIL:
+            return True  # Assume sufficient if it cannot be checked
+        
         try:
-            import psutil
             disk = psutil.disk_usage(path)
             usage_percent = disk.used / disk.total
             
             if usage_percent > threshold_percent:
                 log_warning(self.logger, f"🚨 Disk space low: {usage_percent*100:.1f}% used (threshold: {threshold_percent*100:.1f}%)")
-                self._log_disk_details(disk)
+                self._log_disk_details(disk, usage_percent)
                 return False
             
             return True
@@ -307,42 +402,55 @@ class MemoryMonitor(LoggerMixin):
             return True  # Assume sufficient if check fails
     
     def get_resource_status(self) -> Dict[str, Any]:
-        """Get comprehensive resource status"""
+        """Get comprehensive resource status (reused for up to _status_ttl seconds)"""
+        now = time.monotonic()
+        if self._status_cache and now - self._status_cache[0] < self._status_ttl:
+            return self._status_cache[1]
+        
+        # Taken only on a cache miss; cached results keep their own timestamp
+        timestamp = datetime.now().isoformat()
+        
+        if not _HAS_PSUTIL:
+            return {
+                'timestamp': timestamp,
+                'error': 'psutil not available - resource monitoring disabled'
+            }
+        
         try:
-            import psutil
-            
             # Memory info
             system_memory = psutil.virtual_memory()
-            process = psutil.Process()
-            process_memory = process.memory_info()
+            process_memory = self._proc.memory_info()
+            process_rss_mb = process_memory.rss * _INV_MB
             
             # Disk info
             disk = psutil.disk_usage('/')
+            disk_used_frac = disk.used / disk.total
             
-            # CPU info
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            # CPU info; non-blocking, measured since the previous call (the
+            # first call in the process reports 0.0)
+            cpu_percent = psutil.cpu_percent(interval=None)
             cpu_count = psutil.cpu_count()
             
             status = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp,
                 'memory': {
-                    'system_total_gb': system_memory.total / (1024**3),
+                    'system_total_gb': system_memory.total * _INV_GB,
                     'system_used_percent': system_memory.percent,
-                    'system_available_gb': system_memory.available / (1024**3),
-                    'process_rss_mb': process_memory.rss / (1024**2),
-                    'process_vms_mb': process_memory.vms / (1024**2),
+                    'system_available_gb': system_memory.available * _INV_GB,
+                    'process_rss_mb': process_rss_mb,
+                    'process_vms_mb': process_memory.vms * _INV_MB,
                     'alerts': {
                         'system_high': system_memory.percent > (self._alert_threshold * 100),
                         'system_critical': system_memory.percent > (self._critical_threshold * 100),
-                        'process_high': (process_memory.rss / (1024**2)) > self.threshold_mb
+                        'process_high': process_rss_mb > self.threshold_mb
                     }
                 },
                 'disk': {
-                    'total_gb': disk.total / (1024**3),
-                    'used_percent': (disk.used / disk.total) * 100,
-                    'free_gb': disk.free / (1024**3),
+                    'total_gb': disk.total * _INV_GB,
+                    'used_percent': disk_used_frac * 100,
+                    'free_gb': disk.free * _INV_GB,
                     'alerts': {
-                        'low_space': (disk.used / disk.total) > 0.9
+                        'low_space': disk_used_frac > 0.9
                     }
                 },
                 'cpu': {
@@ -352,82 +460,83 @@ class MemoryMonitor(LoggerMixin):
                         'high_usage': cpu_percent > 80
                     }
                 },
-                'temp_files': len(self.resource_manager._temp_files) if self.resource_manager else 0,
+                'temp_files': len(self.resource_manager._tracked_temp_files()) if self.resource_manager else 0,
                 'temp_dirs': len(self.resource_manager._temp_dirs) if self.resource_manager else 0
             }
             
+            self._status_cache = (now, status)
             return status
             
-        except ImportError:
-            return {
-                'timestamp': datetime.now().isoformat(),
-                'error': 'psutil not available - resource monitoring disabled'
-            }
         except Exception as e:
             return {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp,
                 'error': f'Error getting resource status: {e}'
             }
     
     def _log_memory_details(self):
-        """Log detailed memory information"""
+        """Log detailed memory information (at most once per _MEMORY_DETAILS_INTERVAL)"""
+        if not _HAS_PSUTIL or not self.logger.isEnabledFor(logging.INFO):
+            return
+        
+        now = time.monotonic()
+        if self._last_details_time is not None and now - self._last_details_time < _MEMORY_DETAILS_INTERVAL:
+            return
+        self._last_details_time = now
+        
         try:
-            import psutil
-            
             memory = psutil.virtual_memory()
             self.logger.info(f"💾 Memory Details:")
-            self.logger.info(f"   Total: {memory.total / (1024**3):.1f} GB")
-            self.logger.info(f"   Available: {memory.available / (1024**3):.1f} GB")
-            self.logger.info(f"   Used: {memory.used / (1024**3):.1f} GB ({memory.percent:.1f}%)")
+            self.logger.info(f"   Total: {memory.total * _INV_GB:.1f} GB")
+            self.logger.info(f"   Available: {memory.available * _INV_GB:.1f} GB")
+            self.logger.info(f"   Used: {memory.used * _INV_GB:.1f} GB ({memory.percent:.1f}%)")
             
             # Show top memory consuming processes
             processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
+            for proc in psutil.process_iter(['name', 'memory_info']):
                 try:
                     info = proc.info
                     if info['memory_info']:
-                        memory_mb = info['memory_info'].rss / (1024**2)
+                        memory_mb = info['memory_info'].rss * _INV_MB
                         if memory_mb > 50:  # Only show processes using >50MB
                             processes.append((info['name'], memory_mb))
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
             
             if processes:
-                processes.sort(key=lambda x: x[1], reverse=True)
                 self.logger.info("   Top memory consumers:")
-                for name, mem_mb in processes[:5]:
+                for name, mem_mb in heapq.nlargest(5, processes, key=lambda x: x[1]):
                     self.logger.info(f"     {name}: {mem_mb:.1f} MB")
             
         except Exception as e:
             self.logger.debug(f"Could not get detailed memory info: {e}")
     
-    def _log_disk_details(self, disk):
+    def _log_disk_details(self, disk, used_frac: float):
         """Log detailed disk information"""
         self.logger.info(f"💿 Disk Details:")
-        self.logger.info(f"   Total: {disk.total / (1024**3):.1f} GB")
-        self.logger.info(f"   Free: {disk.free / (1024**3):.1f} GB")
-        self.logger.info(f"   Used: {disk.used / (1024**3):.1f} GB ({(disk.used/disk.total)*100:.1f}%)")
+        self.logger.info(f"   Total: {disk.total * _INV_GB:.1f} GB")
+        self.logger.info(f"   Free: {disk.free * _INV_GB:.1f} GB")
+        self.logger.info(f"   Used: {disk.used * _INV_GB:.1f} GB ({used_frac*100:.1f}%)")
     
     def _trigger_emergency_cleanup(self):
         """Emergency cleanup for critical memory situations"""
         self.logger.warning("🚨 Triggering emergency cleanup due to critical memory usage")
         
-        # Force garbage collection multiple times
-        import gc
-        for i in range(3):
-            collected = gc.collect()
-            self.logger.debug(f"GC pass {i+1}: collected {collected} objects")
+        # Clear registered memoization caches so their entries can be collected
+        for fn in _LRU_CACHES:
+            fn.cache_clear()
         
-        # Cleanup resources aggressively
+        # Cleanup resources aggressively; cleanup_all() finishes with a full
+        # collection, and repeating it right away rarely frees more
         if self.resource_manager:
             self.resource_manager.cleanup_all()
+        else:
+            collected = gc.collect()
+            self.logger.debug(f"GC: collected {collected} objects")
         
-        # Clear any caches if available
-        try:
-            import functools
-            functools.lru_cache.cache_clear = getattr(functools.lru_cache, 'cache_clear', lambda: None)
-        except:
-            pass
+        # Only spend a second full traversal if memory is still critical
+        if _HAS_PSUTIL and psutil.virtual_memory().percent > self._critical_threshold * 100:
+            collected = gc.collect(2)
+            self.logger.debug(f"GC second pass: collected {collected} objects")
         
         self.logger.info("🧹 Emergency cleanup completed")
     
@@ -455,6 +564,9 @@ def get_resource_manager() -> ResourceManager:
     global _global_resource_manager
     if _global_resource_manager is None:
         _global_resource_manager = ResourceManager()
+        # Objects alive at startup (modules, settings, services) live for the
+        # whole run; freezing them keeps later full collections from rescanning
+        gc.freeze()
     return _global_resource_manager
 
 
@@ -480,10 +592,10 @@ def cleanup_resources():
 
 # Context managers for easy use
 @contextmanager
-def temp_file(suffix: str = '', prefix: str = 'mp_') -> ContextManager[Path]:
+def temp_file(suffix: str = '', prefix: str = 'mp_', defer: bool = False) -> ContextManager[Path]:
     """Convenient temporary file context manager"""
     resource_manager = get_resource_manager()
-    with resource_manager.temporary_file(suffix=suffix, prefix=prefix) as temp_path:
+    with resource_manager.temporary_file(suffix=suffix, prefix=prefix, defer=defer) as temp_path:
         yield temp_path
 
 
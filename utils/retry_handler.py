@@ -3,10 +3,15 @@ Retry handling utilities with exponential backoff for Meeting Processor
 Provides robust error handling for API calls and I/O operations
 """
 
+import os
+import re
 import time
 import random
+import asyncio
+import inspect
 import functools
-from typing import Type, Tuple, Callable, Any, Optional, List
+import threading
+from typing import Type, Tuple, Callable, Any, Optional, List, Dict
 from utils.logger import LoggerMixin, log_warning, log_error
 
 
@@ -25,6 +30,85 @@ class IORetryableError(RetryableError):
     pass
 
 
+def _exception_tuple(exceptions) -> Tuple[Type[Exception], ...]:
+    """Normalize an exception class or collection of classes to a tuple"""
+    if isinstance(exceptions, tuple):
+        return exceptions
+    if isinstance(exceptions, type):
+        return (exceptions,)
+    return tuple(exceptions)
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for a remote dependency
+    
+    After failure_threshold consecutive failed calls the circuit opens and
+    calls are rejected without being attempted. Once reset_timeout seconds
+    have passed, a single probe call is let through (half-open): success
+    closes the circuit, failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at = 0.0  # monotonic seconds
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Whether a new call may start"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            
+            # Half-open: only one probe at a time (a probe that never reported
+            # back, e.g. a cancelled task, is given up after reset_timeout)
+            now = time.monotonic()
+            if self._probe_in_flight and now - self._probe_started < self.reset_timeout:
+                return False
+            self._probe_in_flight = True
+            self._probe_started = now
+            return True
+    
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected outright"""
+        return self.state == self.OPEN
+    
+    def record_success(self) -> None:
+        """Close the circuit after a call that reached the dependency"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failure_count = 0
+            self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit at the threshold"""
+        with self._lock:
+            self.failure_count += 1
+            if self.state == self.HALF_OPEN or self.failure_count >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+    
+    def get_state(self) -> str:
+        """Current state name, for metrics"""
+        return self.state
+
+
 class RetryHandler(LoggerMixin):
     """Handles retry logic with exponential backoff and jitter"""
     
@@ -33,7 +117,10 @@ class RetryHandler(LoggerMixin):
                  base_delay: float = 1.0,
                  max_delay: float = 60.0,
                  exponential_base: float = 2.0,
-                 jitter: bool = True):
+                 jitter: bool = True,
+                 circuit_breaker: bool = False,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
         """
         Initialize retry handler
         
@@ -42,30 +129,59 @@ class RetryHandler(LoggerMixin):
             base_delay: Base delay in seconds
             max_delay: Maximum delay in seconds
             exponential_base: Base for exponential backoff
-            jitter: Whether to add random jitter to delays
+            jitter: Whether to randomize delays over [0, backoff] (full jitter)
+            circuit_breaker: Whether to fail fast once a dependency keeps failing
+            failure_threshold: Consecutive failed calls that open a circuit
+            reset_timeout: Seconds an open circuit waits before a probe call
         """
         self.max_attempts = max_attempts
         self.base_delay = base_delay
         self.max_delay = max_delay
         self.exponential_base = exponential_base
         self.jitter = jitter
+        self.circuit_breaker = circuit_breaker
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        
+        # One breaker per decorated dependency, keyed by context or qualname
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+        
+        # Per-handler generator so concurrent retries don't share the module RNG
+        self._rng = random.Random()
+    
+    def _get_breaker(self, key: str) -> CircuitBreaker:
+        """Get or create the circuit breaker for a dependency"""
+        with self._breakers_lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+    
+    def get_circuit_states(self) -> Dict[str, str]:
+        """State of every circuit breaker, keyed by dependency"""
+        with self._breakers_lock:
+            return {key: breaker.get_state() for key, breaker in self._breakers.items()}
+    
+    def _circuit_open_error(self, key: str) -> APIRetryableError:
+        """Log and build the error raised when a circuit rejects a call"""
+        log_warning(self.logger, f"⛔ Circuit open for {key}; failing fast")
+        return APIRetryableError(f"Circuit open for {key}")
     
     def calculate_delay(self, attempt: int) -> float:
         """Calculate delay for given attempt number"""
         if attempt <= 0:
             return 0
         
-        # Exponential backoff
-        delay = self.base_delay * (self.exponential_base ** (attempt - 1))
-        
-        # Cap at max delay
-        delay = min(delay, self.max_delay)
+        # Exponential backoff, capped at max delay
+        cap = min(self.base_delay * (self.exponential_base ** (attempt - 1)), self.max_delay)
         
-        # Add jitter to prevent thundering herd
+        # Full jitter: spread retries uniformly over [0, cap] so clients that
+        # failed together don't retry together, even once the cap is reached
         if self.jitter:
-            delay = delay * (0.5 + random.random() * 0.5)
+            return self._rng.uniform(0, cap)
         
-        return delay
+        return cap
     
     def retry(self, 
               retryable_exceptions: Tuple[Type[Exception], ...] = (RetryableError,),
@@ -79,40 +195,106 @@ class RetryHandler(LoggerMixin):
             non_retryable_exceptions: Tuple of exception types to never retry on
             context: Optional context string for logging
         """
+        # Resolved once here rather than on every attempt: the except clauses
+        # need real tuples (a list or a bare class would fail or be rebuilt)
+        retryable = _exception_tuple(retryable_exceptions)
+        non_retryable = _exception_tuple(non_retryable_exceptions)
+        delay_before_retry = self._delay_before_retry
+        
         def decorator(func: Callable) -> Callable:
+            func_name = func.__name__
+            breaker_key = context or func.__qualname__
+            breaker = self._get_breaker(breaker_key) if self.circuit_breaker else None
+            
+            if inspect.iscoroutinefunction(func):
+                # Coroutines back off with asyncio.sleep so the event loop
+                # keeps running other tasks while this one waits
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs) -> Any:
+                    last_exception = None
+                    
+                    if breaker and not breaker.allow():
+                        raise self._circuit_open_error(breaker_key)
+                    
+                    for attempt in range(1, self.max_attempts + 1):
+                        # Stop retrying if another caller opened the circuit meanwhile
+                        if breaker and attempt > 1 and breaker.is_open():
+                            raise self._circuit_open_error(breaker_key) from last_exception
+                        
+                        try:
+                            result = await func(*args, **kwargs)
+                            if breaker:
+                                breaker.record_success()
+                            return result
+                        
+                        except non_retryable as e:
+                            # Don't retry these exceptions; the dependency did answer
+                            if breaker:
+                                breaker.record_success()
+                            log_error(self.logger, f"Non-retryable error in {func_name}: {e}")
+                            raise
+                        
+                        except retryable as e:
+                            last_exception = e
+                            delay = delay_before_retry(attempt, func_name, context, e)
+                            if delay is None:
+                                if breaker:
+                                    breaker.record_failure()
+                                raise
+                            await asyncio.sleep(delay)
+                        
+                        except Exception as e:
+                            # Unexpected exception - don't retry or count it as an outage
+                            if breaker:
+                                breaker.record_success()
+                            log_error(self.logger, f"Unexpected error in {func_name}: {e}")
+                            raise
+                    
+                    # This should never be reached, but just in case
+                    if last_exception:
+                        raise last_exception
+                
+                return async_wrapper
+            
             @functools.wraps(func)
             def wrapper(*args, **kwargs) -> Any:
                 last_exception = None
-                func_name = func.__name__
+                
+                if breaker and not breaker.allow():
+                    raise self._circuit_open_error(breaker_key)
                 
                 for attempt in range(1, self.max_attempts + 1):
+                    # Stop retrying if another caller opened the circuit meanwhile
+                    if breaker and attempt > 1 and breaker.is_open():
+                        raise self._circuit_open_error(breaker_key) from last_exception
+                    
                     try:
-                        return func(*args, **kwargs)
+                        result = func(*args, **kwargs)
+                        if breaker:
+                            breaker.record_success()
+                        return result
                     
-                    except non_retryable_exceptions as e:
-                        # Don't retry these exceptions
-                        log_error(f"❌ Non-retryable error in {func_name}: {e}")
+                    except non_retryable as e:
+                        # Don't retry these exceptions; the dependency did answer
+                        if breaker:
+                            breaker.record_success()
+                        log_error(self.logger, f"Non-retryable error in {func_name}: {e}")
                         raise
                     
-                    except retryable_exceptions as e:
+                    except retryable as e:
                         last_exception = e
-                        
-                        if attempt == self.max_attempts:
-                            # Final attempt failed
-                            context_str = f" ({context})" if context else ""
-                            log_error(f"💥 All retry attempts failed for {func_name}{context_str}: {e}")
+                        delay = delay_before_retry(attempt, func_name, context, e)
+                        if delay is None:
+                            if breaker:
+                                breaker.record_failure()
                             raise
-                        
-                        # Calculate delay and wait
-                        delay = self.calculate_delay(attempt)
-                        context_str = f" ({context})" if context else ""
-                        log_warning(f"🔄 Attempt {attempt}/{self.max_attempts} failed for {func_name}{context_str}: {e}. Retrying in {delay:.2f}s...")
-                        
                         time.sleep(delay)
                     
                     except Exception as e:
-                        # Unexpected exception - don't retry
-                        log_error(f"❌ Unexpected error in {func_name}: {e}")
+                        # Unexpected exception - don't retry or count it as an outage
+                        if breaker:
+                            breaker.record_success()
+                        log_error(self.logger, f"Unexpected error in {func_name}: {e}")
                         raise
                 
                 # This should never be reached, but just in case
@@ -121,6 +303,26 @@ class RetryHandler(LoggerMixin):
                 
             return wrapper
         return decorator
+    
+    def _delay_before_retry(self, attempt: int, func_name: str, context: Optional[str],
+                            error: Exception) -> Optional[float]:
+        """
+        Log a failed attempt and return the delay before the next one
+        
+        Returns:
+            None if this was the final attempt and the error should propagate
+        """
+        context_str = f" ({context})" if context else ""
+        
+        if attempt == self.max_attempts:
+            # Final attempt failed
+            log_error(self.logger, f"💥 All retry attempts failed for {func_name}{context_str}: {error}")
+            return None
+        
+        # Calculate delay and wait
+        delay = self.calculate_delay(attempt)
+        log_warning(self.logger, f"🔄 Attempt {attempt}/{self.max_attempts} failed for {func_name}{context_str}: {error}. Retrying in {delay:.2f}s...")
+        return delay
 
 
 # Pre-configured retry handlers for common scenarios
@@ -129,7 +331,10 @@ api_retry = RetryHandler(
     base_delay=2.0,
     max_delay=30.0,
     exponential_base=2.0,
-    jitter=True
+    jitter=True,
+    circuit_breaker=True,
+    failure_threshold=5,
+    reset_timeout=30.0
 )
 
 io_retry = RetryHandler(
@@ -195,27 +400,52 @@ FILE_IO_RETRYABLE_EXCEPTIONS = (
 )
 
 
+# API error messages are classified in one case-insensitive scan; when a
+# message matches several categories the first in _API_ERROR_CATEGORIES wins
+_API_ERROR_RE = re.compile(
+    r"(?P<rate_limit>rate limit|quota|too many requests)"
+    r"|(?P<network>timeout|connection|network)"
+    r"|(?P<server>server error|50[0234])",
+    re.IGNORECASE
+)
+_API_ERROR_CATEGORIES = (
+    ("rate_limit", "Rate limited"),
+    ("network", "Network error"),
+    ("server", "Server error"),
+)
+
+# File error messages are classified the same way; checks run in the order
+# lock, space, network_drive
+_FILE_ERROR_RE = re.compile(
+    r"(?P<lock>permission denied|file in use|locked)"
+    r"|(?P<space>no space left)"
+    r"|(?P<network_drive>network|remote)",
+    re.IGNORECASE
+)
+
+
+def _classifier_disabled() -> bool:
+    """Whether RETRY_CLASSIFIER_DISABLE opts out of error classification"""
+    return os.environ.get("RETRY_CLASSIFIER_DISABLE", "").lower() in ("1", "true", "yes")
+
+
 def handle_api_errors(func: Callable) -> Callable:
     """Decorator to convert API errors to retryable errors"""
+    # Opted out: return the function itself, so calls pay for no wrapper
+    if _classifier_disabled():
+        return func
+    
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
         except Exception as e:
-            # Convert specific API errors to retryable errors
-            error_message = str(e).lower()
-            
-            # Rate limiting
-            if any(term in error_message for term in ['rate limit', 'quota', 'too many requests']):
-                raise APIRetryableError(f"Rate limited: {e}")
-            
-            # Network issues
-            if any(term in error_message for term in ['timeout', 'connection', 'network']):
-                raise APIRetryableError(f"Network error: {e}")
-            
-            # Server errors (5xx)
-            if any(term in error_message for term in ['server error', '500', '502', '503', '504']):
-                raise APIRetryableError(f"Server error: {e}")
+            # Convert rate limiting, network issues and server errors (5xx)
+            # to retryable errors
+            categories = {match.lastgroup for match in _API_ERROR_RE.finditer(str(e))}
+            for category, label in _API_ERROR_CATEGORIES:
+                if category in categories:
+                    raise APIRetryableError(f"{label}: {e}")
             
             # Re-raise as is if not retryable
             raise
@@ -225,23 +455,27 @@ def handle_api_errors(func: Callable) -> Callable:
 
 def handle_file_errors(func: Callable) -> Callable:
     """Decorator to convert file I/O errors to retryable errors"""
+    # Opted out: return the function itself, so calls pay for no wrapper
+    if _classifier_disabled():
+        return func
+    
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
         except (PermissionError, OSError) as e:
-            error_message = str(e).lower()
+            categories = {match.lastgroup for match in _FILE_ERROR_RE.finditer(str(e))}
             
             # Temporary file locks or permission issues
-            if any(term in error_message for term in ['permission denied', 'file in use', 'locked']):
+            if "lock" in categories:
                 raise IORetryableError(f"File access error: {e}")
             
             # Disk space issues (generally not retryable)
-            if 'no space left' in error_message:
+            if "space" in categories:
                 raise  # Don't retry disk space issues
             
             # Network drive issues
-            if any(term in error_message for term in ['network', 'remote']):
+            if "network_drive" in categories:
                 raise IORetryableError(f"Network drive error: {e}")
             
             # Re-raise as is
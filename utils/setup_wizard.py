@@ -5,13 +5,39 @@ Guides users through configuration with validation and helpful defaults
 
 import os
 import json
+import stat
 import getpass
+import functools
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Union, Callable
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 import re
+from datetime import datetime
 from urllib.parse import urlparse
 
+# Google Drive folder IDs are URL-safe base64-style tokens
+_FOLDER_ID_RE = re.compile(r'[A-Za-z0-9_-]+')
+
+# Placeholders a file naming template may use
+_PLACEHOLDER_NAMES = ("topic", "date", "time", "metadata", "type", "duration")
+_NAMING_PLACEHOLDERS = tuple(f"{{{name}}}" for name in _PLACEHOLDER_NAMES)
+# One shared "{" prefix, then the names: a single pass finds any placeholder
+_PLACEHOLDER_RE = re.compile(r"\{(?:" + "|".join(_PLACEHOLDER_NAMES) + r")\}")
+
+
+@functools.lru_cache(maxsize=4)
+def _openai_client(api_key: str):
+    """OpenAI client for an API key, reused across connection tests"""
+    import openai
+    return openai.OpenAI(api_key=api_key)
+
+
+@functools.lru_cache(maxsize=4)
+def _anthropic_client(api_key: str):
+    """Anthropic client for an API key, reused across connection tests"""
+    import anthropic
+    return anthropic.Anthropic(api_key=api_key)
 
 @dataclass
 class ConfigField:
@@ -20,7 +46,7 @@ class ConfigField:
     display_name: str
     description: str
     required: bool = True
-    default: Optional[str] = None
+    default: Union[str, Callable[[], Optional[str]], None] = None  # value or factory
     validator: Optional[callable] = None
     masked: bool = False  # For passwords/API keys
     help_url: Optional[str] = None
@@ -29,13 +55,26 @@ class ConfigField:
 class SetupWizard:
     """Interactive setup wizard with validation and guidance"""
     
+    # .env layout: (section header, keys written if set, google_drive mode only)
+    _ENV_SECTIONS = (
+        ("# API Keys", ("OPENAI_API_KEY", "ANTHROPIC_API_KEY"), False),
+        ("# Storage Configuration", ("STORAGE_MODE", "OBSIDIAN_VAULT_PATH"), False),
+        ("# Google Drive Configuration", (
+            "GOOGLE_DRIVE_INPUT_FOLDER_ID",
+            "GOOGLE_DRIVE_OUTPUT_FOLDER_ID",
+            "GOOGLE_DRIVE_PROCESSED_FOLDER_ID",
+        ), True),
+        ("# Optional Settings", ("FILE_NAMING_TEMPLATE",), False),
+    )
+    
     def __init__(self):
         self.config = {}
         self.errors = []
         self.warnings = []
         
-        # Define configuration fields
-        self.config_fields = [
+        # Define configuration fields, segmented so the Google Drive group is
+        # gated on storage mode once rather than tested field by field
+        self._core_fields = [
             ConfigField(
                 name="OPENAI_API_KEY",
                 display_name="OpenAI API Key",
@@ -59,7 +98,7 @@ class SetupWizard:
                 display_name="Obsidian Vault Path",
                 description="Path to your Obsidian vault directory",
                 required=True,
-                default=self._detect_obsidian_vault(),
+                default=self._detect_obsidian_vault,  # probed only when prompted
                 validator=self._validate_vault_path,
                 help_url="https://help.obsidian.md/Getting+started/Create+a+vault"
             ),
@@ -70,7 +109,9 @@ class SetupWizard:
                 required=True,
                 default="local",
                 validator=self._validate_storage_mode
-            ),
+            )
+        ]
+        self._google_drive_fields = [
             ConfigField(
                 name="GOOGLE_DRIVE_INPUT_FOLDER_ID",
                 display_name="Google Drive Input Folder ID",
@@ -92,7 +133,9 @@ class SetupWizard:
                 description="Google Drive folder ID for processed files",
                 required=False,
                 validator=self._validate_folder_id
-            ),
+            )
+        ]
+        self._optional_fields = [
             ConfigField(
                 name="FILE_NAMING_TEMPLATE",
                 display_name="File Naming Template",
@@ -102,6 +145,7 @@ class SetupWizard:
                 validator=self._validate_naming_template
             )
         ]
+        self.config_fields = self._core_fields + self._google_drive_fields + self._optional_fields
     
     def run_interactive_setup(self) -> bool:
         """Run the complete interactive setup process"""
@@ -158,14 +202,16 @@ class SetupWizard:
     def _load_existing_env(self, env_file: Path):
         """Load existing environment file"""
         try:
-            with open(env_file, 'r') as f:
+            with open(env_file, 'r', encoding='utf-8') as f:
                 for line in f:
                     line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
+                    if not line or line[0] == '#':
+                        continue
+                    
+                    key, sep, value = line.partition('=')
+                    if sep:
                         # Remove quotes if present
-                        value = value.strip('"\'')
-                        self.config[key] = value
+                        self.config[key.strip()] = value.strip().strip('"\'')
         except Exception as e:
             print(f"⚠️ Could not load existing configuration: {e}")
     
@@ -174,12 +220,15 @@ class SetupWizard:
         print("📝 Configuration Setup")
         print("-" * 30)
         
-        for field in self.config_fields:
-            # Skip Google Drive fields if using local storage
-            if (field.name.startswith("GOOGLE_DRIVE") and 
-                self.config.get("STORAGE_MODE", "local") == "local"):
-                continue
-            
+        for field in self._core_fields:
+            self._collect_field(field)
+            print()  # Add spacing between fields
+        
+        # Storage mode is known once the core fields are in; Google Drive
+        # fields only apply to google_drive mode
+        drive_fields = self._google_drive_fields if self.config.get("STORAGE_MODE") == "google_drive" else []
+        
+        for field in drive_fields + self._optional_fields:
             self._collect_field(field)
             print()  # Add spacing between fields
     
@@ -192,7 +241,9 @@ class SetupWizard:
             print(f"   📖 Help: {field.help_url}")
         
         # Get current/default value
-        current_value = self.config.get(field.name, field.default)
+        current_value = self.config.get(field.name)
+        if current_value is None:
+            current_value = field.default() if callable(field.default) else field.default
         if current_value:
             display_value = "***hidden***" if field.masked else current_value
             print(f"   Current: {display_value}")
@@ -287,37 +338,30 @@ class SetupWizard:
         print("🧪 Testing Configuration")
         print("-" * 30)
         
-        # Test OpenAI API
+        # (probe, success message, failure message) for each configured service
+        probes = []
         if "OPENAI_API_KEY" in self.config:
-            print("🔄 Testing OpenAI API connection...")
-            if self._test_openai_connection():
-                print("✅ OpenAI API: Connected successfully")
-            else:
-                print("❌ OpenAI API: Connection failed")
-        
-        # Test Anthropic API
+            probes.append((self._test_openai_connection,
+                           "✅ OpenAI API: Connected successfully", "❌ OpenAI API: Connection failed"))
         if "ANTHROPIC_API_KEY" in self.config:
-            print("🔄 Testing Anthropic API connection...")
-            if self._test_anthropic_connection():
-                print("✅ Anthropic API: Connected successfully")
-            else:
-                print("❌ Anthropic API: Connection failed")
-        
-        # Test Obsidian vault
+            probes.append((self._test_anthropic_connection,
+                           "✅ Anthropic API: Connected successfully", "❌ Anthropic API: Connection failed"))
         if "OBSIDIAN_VAULT_PATH" in self.config:
-            print("🔄 Testing Obsidian vault access...")
-            if self._test_vault_access():
-                print("✅ Obsidian Vault: Accessible")
-            else:
-                print("❌ Obsidian Vault: Access failed")
-        
-        # Test Google Drive (if configured)
+            probes.append((self._test_vault_access,
+                           "✅ Obsidian Vault: Accessible", "❌ Obsidian Vault: Access failed"))
         if self.config.get("STORAGE_MODE") == "google_drive":
-            print("🔄 Testing Google Drive access...")
-            if self._test_google_drive_access():
-                print("✅ Google Drive: Accessible")
-            else:
-                print("❌ Google Drive: Access failed")
+            probes.append((self._test_google_drive_access,
+                           "✅ Google Drive: Accessible", "❌ Google Drive: Access failed"))
+        
+        if probes:
+            print("🔄 Testing connections...")
+            
+            # The probes are independent and mostly network-bound, so they run
+            # concurrently; results are still reported in a fixed order
+            with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+                futures = [(executor.submit(probe), ok_msg, fail_msg) for probe, ok_msg, fail_msg in probes]
+                for future, ok_msg, fail_msg in futures:
+                    print(ok_msg if future.result() else fail_msg)
         
         print()
     
@@ -329,21 +373,27 @@ class SetupWizard:
         try:
             env_content = self._generate_env_content()
             
-            # Create backup of existing .env
+            # Create backup of existing .env, copied rather than moved so the
+            # live file stays in place until the new one replaces it
             env_file = Path(".env")
             if env_file.exists():
                 backup_file = Path(".env.backup")
-                env_file.rename(backup_file)
+                self._write_private_file(backup_file, env_file.read_bytes())
                 print(f"📄 Created backup: {backup_file}")
             
-            # Write new .env file
-            with open(env_file, 'w') as f:
-                f.write(env_content)
+            # Write the new file alongside, then swap it in
+            tmp_file = Path(".env.tmp")
+            try:
+                self._write_private_file(tmp_file, env_content.encode('utf-8'))
+                
+                # Atomic swap: readers see the old .env or the new one,
+                # never a missing or partially written file
+                os.replace(tmp_file, env_file)
+            except BaseException:
+                tmp_file.unlink(missing_ok=True)
+                raise
             
             print(f"✅ Configuration saved to: {env_file}")
-            
-            # Set appropriate permissions
-            os.chmod(env_file, 0o600)  # Read/write for owner only
             print("🔒 Set secure file permissions")
             
             return True
@@ -352,90 +402,70 @@ class SetupWizard:
             print(f"❌ Failed to save configuration: {e}")
             return False
     
+    @staticmethod
+    def _write_private_file(path: Path, data: bytes):
+        """Write a new file that is read/write for its owner only"""
+        # Created with mode 0o600 so the API keys are never readable by
+        # others, even briefly. O_EXCL refuses to write through a file (or
+        # symlink) planted at the path after the unlink
+        path.unlink(missing_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+    
     def _generate_env_content(self) -> str:
         """Generate .env file content"""
         lines = [
             "# Meeting Processor Configuration",
             "# Generated by Setup Wizard",
             f"# Created: {datetime.now().isoformat()}",
-            "",
-            "# API Keys",
         ]
         
-        # Add API keys
-        api_keys = ["OPENAI_API_KEY", "ANTHROPIC_API_KEY"]
-        for key in api_keys:
-            if key in self.config:
-                lines.append(f'{key}="{self.config[key]}"')
-        
-        lines.extend([
-            "",
-            "# Storage Configuration",
-        ])
-        
-        # Add storage config
-        storage_keys = ["STORAGE_MODE", "OBSIDIAN_VAULT_PATH"]
-        for key in storage_keys:
-            if key in self.config:
-                lines.append(f'{key}="{self.config[key]}"')
-        
-        # Add Google Drive config if needed
-        if self.config.get("STORAGE_MODE") == "google_drive":
-            lines.extend([
-                "",
-                "# Google Drive Configuration",
-            ])
+        google_drive = self.config.get("STORAGE_MODE") == "google_drive"
+        for header, keys, google_drive_only in self._ENV_SECTIONS:
+            if google_drive_only and not google_drive:
+                continue
             
-            gd_keys = [
-                "GOOGLE_DRIVE_INPUT_FOLDER_ID",
-                "GOOGLE_DRIVE_OUTPUT_FOLDER_ID",
-                "GOOGLE_DRIVE_PROCESSED_FOLDER_ID"
-            ]
-            for key in gd_keys:
-                if key in self.config:
-                    lines.append(f'{key}="{self.config[key]}"')
-        
-        # Add optional settings
-        lines.extend([
-            "",
-            "# Optional Settings",
-        ])
-        
-        optional_keys = ["FILE_NAMING_TEMPLATE"]
-        for key in optional_keys:
-            if key in self.config:
-                lines.append(f'{key}="{self.config[key]}"')
+            lines.append("")
+            lines.append(header)
+            lines.extend(f'{key}="{self.config[key]}"' for key in keys if key in self.config)
         
         return "\n".join(lines) + "\n"
     
     # Validation methods
     def _validate_openai_key(self, key: str) -> Tuple[bool, str]:
         """Validate OpenAI API key format"""
+        # Length first: the O(1) test rejects truncated keys before any
+        # prefix comparison; the checks below only pick the error message
+        if len(key) >= 20 and key.startswith("sk-"):
+            return True, "Valid format"
         if not key.startswith("sk-"):
             return False, "OpenAI API keys should start with 'sk-'"
-        if len(key) < 20:
-            return False, "OpenAI API key seems too short"
-        return True, "Valid format"
+        return False, "OpenAI API key seems too short"
     
     def _validate_anthropic_key(self, key: str) -> Tuple[bool, str]:
         """Validate Anthropic API key format"""
+        # Length first: the O(1) test rejects truncated keys before any
+        # prefix comparison; the checks below only pick the error message
+        if len(key) >= 20 and key.startswith("sk-ant-"):
+            return True, "Valid format"
         if not key.startswith("sk-ant-"):
             return False, "Anthropic API keys should start with 'sk-ant-'"
-        if len(key) < 20:
-            return False, "Anthropic API key seems too short"
-        return True, "Valid format"
+        return False, "Anthropic API key seems too short"
     
     def _validate_vault_path(self, path: str) -> Tuple[bool, str]:
         """Validate Obsidian vault path"""
-        vault_path = Path(path)
-        if not vault_path.exists():
+        # One stat answers both "exists" and "is a directory"
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            # Also covers symlink loops and paths containing NUL bytes
             return False, "Path does not exist"
-        if not vault_path.is_dir():
+        if not stat.S_ISDIR(st.st_mode):
             return False, "Path is not a directory"
         
         # Check for .obsidian directory (indicates it's a vault)
-        obsidian_dir = vault_path / ".obsidian"
-        if not obsidian_dir.exists():
+        if not os.path.exists(os.path.join(path, ".obsidian")):
             return False, "Directory does not appear to be an Obsidian vault (missing .obsidian folder)"
         
         return True, "Valid Obsidian vault"
@@ -457,7 +487,7 @@ class SetupWizard:
             return False, "Folder ID seems too short"
         
         # Check for valid characters
-        if not re.match(r'^[a-zA-Z0-9_-]+$', folder_id):
+        if not _FOLDER_ID_RE.fullmatch(folder_id):
             return False, "Folder ID contains invalid characters"
         
         return True, "Valid format"
@@ -468,26 +498,30 @@ class SetupWizard:
             return False, "Naming template cannot be empty"
         
         # Check for valid placeholders
-        valid_placeholders = ["{topic}", "{date}", "{time}", "{metadata}", "{type}", "{duration}"]
-        if not any(placeholder in template for placeholder in valid_placeholders):
-            return False, f"Template should contain at least one placeholder: {', '.join(valid_placeholders)}"
+        if not _PLACEHOLDER_RE.search(template):
+            return False, f"Template should contain at least one placeholder: {', '.join(_NAMING_PLACEHOLDERS)}"
         
         return True, "Valid template"
     
     # Detection methods
-    def _detect_obsidian_vault(self) -> Optional[str]:
-        """Auto-detect Obsidian vault location"""
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _detect_obsidian_vault() -> Optional[str]:
+        """Auto-detect Obsidian vault location (probed once per process)"""
+        home = str(Path.home())
         common_paths = [
-            Path.home() / "Documents" / "Obsidian",
-            Path.home() / "Obsidian",
-            Path.home() / "vault",
-            Path.home() / "Notes",
-            Path("/obsidian_vault"),  # Docker default
+            os.path.join(home, "Documents", "Obsidian"),
+            os.path.join(home, "Obsidian"),
+            os.path.join(home, "vault"),
+            os.path.join(home, "Notes"),
+            "/obsidian_vault",  # Docker default
         ]
         
+        # One stat per candidate: .obsidian can only exist inside an
+        # existing directory
         for path in common_paths:
-            if path.exists() and (path / ".obsidian").exists():
-                return str(path)
+            if os.path.exists(os.path.join(path, ".obsidian")):
+                return path
         
         return None
     
@@ -495,19 +529,24 @@ class SetupWizard:
     def _test_openai_connection(self) -> bool:
         """Test OpenAI API connection"""
         try:
-            import openai
-            client = openai.OpenAI(api_key=self.config["OPENAI_API_KEY"])
-            models = client.models.list()
-            return len(models.data) > 0
+            client = _openai_client(self.config["OPENAI_API_KEY"])
+            # Fetch just the transcription model instead of listing them all
+            client.models.retrieve("whisper-1")
+            return True
         except Exception:
             return False
     
     def _test_anthropic_connection(self) -> bool:
         """Test Anthropic API connection"""
         try:
-            import anthropic
-            client = anthropic.Anthropic(api_key=self.config["ANTHROPIC_API_KEY"])
-            # Simple test message
+            client = _anthropic_client(self.config["ANTHROPIC_API_KEY"])
+            
+            # Listing one model authenticates without spending tokens; SDKs
+            # without the models API fall back to a minimal message
+            if hasattr(client, "models"):
+                client.models.list(limit=1)
+                return True
+            
             response = client.messages.create(
                 model="claude-3-haiku-20240307",
                 max_tokens=10,
@@ -568,6 +607,5 @@ def run_setup_wizard() -> bool:
 
 if __name__ == "__main__":
     # Allow running the wizard standalone
-    from datetime import datetime
     success = run_setup_wizard()
     exit(0 if success else 1)
\ No newline at end of file